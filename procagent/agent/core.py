@@ -21,7 +21,7 @@ from claude_agent_sdk import (
 
 from ..config import get_settings
 from ..logging_config import get_logger
-from ..mcp.promax_server import create_promax_mcp_server, ALLOWED_TOOLS, get_promax_state
+from ..mcp.promax_server import create_promax_mcp_server, ALLOWED_TOOLS, close_promax_session
 from ..models import (
     AgentResponse,
     ChatMessage,
@@ -57,6 +57,7 @@ Help engineers create and run process simulations in ProMax.
 ### Components & Streams
 - add_components: Add chemical components to environment
 - create_stream: Create process streams at (x, y) position in mm
+- create_configured_stream: Create a stream, optionally connect it to a block, set T/P/flow and composition, and flash it in one call (preferred for feed streams)
 - set_stream_properties: Set temperature (°C), pressure (kPa), molar flow (kmol/hr)
 - set_stream_composition: Set mole fractions (MUST sum to 1.0)
 - flash_stream: Flash stream to equilibrium (call after setting T/P/composition)
@@ -65,8 +66,11 @@ Help engineers create and run process simulations in ProMax.
 
 ### Blocks (Unit Operations)
 - create_block: Create unit operation (separator, staged_column, mixer, pump, compressor, heat_exchanger, valve)
+- create_blocks_bulk: Create several blocks in one call (list of {block_type, name, x, y})
 - connect_stream: Connect stream to block inlet/outlet via connection points
+- connect_streams_bulk: Connect several streams in one call (list of {stream_name, block_name, connection_point, is_inlet})
 - list_blocks: List all blocks in flowsheet
+- batch_build: Run many create/connect/set/flash operations in one call; use {"$ref": "<op id>"} to refer to a stream or block created earlier in the batch
 
 ### Simulation
 - run_simulation: Run the flowsheet solver
@@ -178,7 +182,7 @@ class ProcAgentCore:
                 if isinstance(msg, SystemMessage):
                     logger.info(f"SDK session: {msg.data.get('session_id', 'unknown')}")
                     logger.debug(f"[SYSTEM] {msg.data}")
-                    yield AgentResponse(
+                    yield AgentResponse.model_construct(
                         type=ResponseType.STATUS,
                         status=f"Connected to Claude ({msg.data.get('model', 'unknown')})"
                     )
@@ -186,15 +190,15 @@ class ProcAgentCore:
                     for block in msg.content:
                         if isinstance(block, TextBlock):
                             logger.debug(f"[TEXT] {block.text[:200]}{'...' if len(block.text) > 200 else ''}")
-                            yield AgentResponse(
+                            yield AgentResponse.model_construct(
                                 type=ResponseType.TEXT,
                                 content=block.text
                             )
                         elif isinstance(block, ToolUseBlock):
                             logger.debug(f"[TOOL_USE] {block.name}: {json.dumps(block.input)}")
-                            yield AgentResponse(
+                            yield AgentResponse.model_construct(
                                 type=ResponseType.TOOL_USE,
-                                tool_info=ToolUseInfo(
+                                tool_info=ToolUseInfo.model_construct(
                                     tool_name=block.name,
                                     tool_input=block.input,
                                     tool_id=block.id
@@ -202,9 +206,9 @@ class ProcAgentCore:
                             )
                 elif isinstance(msg, ResultMessage):
                     logger.debug(f"[RESULT] duration_ms={getattr(msg, 'duration_ms', 0)}")
-                    yield AgentResponse(
+                    yield AgentResponse.model_construct(
                         type=ResponseType.RESULTS,
-                        results=ResultsInfo(
+                        results=ResultsInfo.model_construct(
                             parameters=[
                                 {"name": "duration_ms", "target": 0, "actual": getattr(msg, 'duration_ms', 0), "unit": "ms", "passed": True},
                             ],
@@ -214,7 +218,7 @@ class ProcAgentCore:
 
         except Exception as e:
             logger.error(f"Agent error: {e}", exc_info=True)
-            yield AgentResponse(
+            yield AgentResponse.model_construct(
                 type=ResponseType.ERROR,
                 content=f"Error: {str(e)}"
             )
@@ -246,12 +250,9 @@ class ProcAgentCore:
         """Clean up resources and close SDK client."""
         logger.info(f"Cleaning up session {self.session_id}")
 
-        # Close ProMax project via state singleton
+        # Close ProMax project on the COM thread that owns it
         try:
-            state = get_promax_state()
-            if state.project:
-                state.project.Close()
-            state.reset()
+            await close_promax_session()
         except Exception as e:
             logger.warning(f"ProMax cleanup error: {e}")
 
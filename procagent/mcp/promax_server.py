@@ -8,20 +8,38 @@ This server is designed to be used as an in-process MCP server with the
 Claude Agent SDK.
 """
 
+import asyncio
+import functools
 import json
+import logging
+import math
 import platform
-from typing import Any, Dict, List, Optional
+import queue
+import re
+import threading
+from array import array
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from claude_agent_sdk import tool, create_sdk_mcp_server
 
 from ..logging_config import get_logger
+from ..models import BlockType
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
 
 logger = get_logger("mcp.promax")
 
 # Platform check
 if platform.system() != "Windows":
     logger.warning(
-        f"ProMax MCP Server requires Windows. Current: {platform.system()}"
+        "ProMax MCP Server requires Windows. Current: %s", platform.system()
     )
 
 
@@ -29,48 +47,104 @@ if platform.system() != "Windows":
 # Unit conversion constants
 # ============================================================================
 
-UNIT_CONVERSIONS = {
-    "temperature": {
-        "K": lambda x: x,
-        "C": lambda x: x + 273.15,
-        "F": lambda x: (x - 32) * 5 / 9 + 273.15,
-        "R": lambda x: x * 5 / 9,
-    },
-    "pressure": {
-        "Pa": lambda x: x,
-        "kPa": lambda x: x * 1000,
-        "bar": lambda x: x * 100000,
-        "atm": lambda x: x * 101325,
-        "psi": lambda x: x * 6894.76,
-    },
-    "flow": {
-        "mol/s": lambda x: x,
-        "kmol/hr": lambda x: x * 1000 / 3600,
-        "kg/s": lambda x: x,
-        "kg/hr": lambda x: x / 3600,
-    },
+# (unit_type, unit) -> (scale, offset); SI value = value * scale + offset
+UNIT_FACTORS: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("temperature", "K"): (1.0, 0.0),
+    ("temperature", "C"): (1.0, 273.15),
+    ("temperature", "F"): (5 / 9, 273.15 - 32 * 5 / 9),
+    ("temperature", "R"): (5 / 9, 0.0),
+    ("pressure", "Pa"): (1.0, 0.0),
+    ("pressure", "kPa"): (1000.0, 0.0),
+    ("pressure", "bar"): (100000.0, 0.0),
+    ("pressure", "atm"): (101325.0, 0.0),
+    ("pressure", "psi"): (6894.76, 0.0),
+    ("flow", "mol/s"): (1.0, 0.0),
+    ("flow", "kmol/hr"): (1000 / 3600, 0.0),
+    ("flow", "kg/s"): (1.0, 0.0),
+    ("flow", "kg/hr"): (1 / 3600, 0.0),
 }
 
+_UNIT_TYPES = frozenset(unit_type for unit_type, _ in UNIT_FACTORS)
+
 # ProMax phase constants
 PMX_TOTAL_PHASE = 5
 PMX_MOLAR_FRAC_BASIS = 6
 
-# Phase property indices (pmxPhasePropEnum)
-PHASE_PROPS = {
-    "temperature": 0,  # K
-    "pressure": 1,     # Pa
-    "molar_flow": 16,  # mol/s
-    "mass_flow": 17,   # kg/s
-}
+
+class PhaseProp(IntEnum):
+    """Phase property indices (pmxPhasePropEnum)."""
+    TEMPERATURE = 0   # K
+    PRESSURE = 1      # Pa
+    MOLAR_FLOW = 16   # mol/s
+    MASS_FLOW = 17    # kg/s
+
+
+# Name-keyed view of PhaseProp, kept for callers that look up by string
+PHASE_PROPS = {prop.name.lower(): prop for prop in PhaseProp}
+
+# Stream property tool arguments:
+# (arg key, input unit, unit type, phase property, result label)
+STREAM_PROPERTY_ARGS = (
+    ("temperature_c", "C", "temperature", PhaseProp.TEMPERATURE, "T={}°C"),
+    ("pressure_kpa", "kPa", "pressure", PhaseProp.PRESSURE, "P={}kPa"),
+    ("molar_flow_kmol_hr", "kmol/hr", "flow", PhaseProp.MOLAR_FLOW, "F={}kmol/hr"),
+)
+
+# Phase properties read by get_stream_results, in result order
+RESULT_PROPS = (PhaseProp.TEMPERATURE, PhaseProp.PRESSURE, PhaseProp.MOLAR_FLOW)
+
+# Stencil and master used for process streams in GUI mode
+STREAM_MASTER = ("Streams.vss", "Process Stream")
+
+# Visio Drop() takes inches; tool coordinates are in mm
+_MM_TO_IN = 1.0 / 25.4
+
+# One "Name=value" entry of a composition string; names may contain spaces
+# and hyphens ("Carbon Dioxide", "n-Butane")
+_COMP_KV_RE = re.compile(
+    r"\s*([^=,]+?)\s*=\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(?:,|$)"
+)
+
+
+def _unit_factors(unit: str, unit_type: str) -> Tuple[float, float]:
+    """Look up (scale, offset) for a unit, raising ValueError if unknown."""
+    try:
+        return UNIT_FACTORS[(unit_type, unit)]
+    except KeyError:
+        if unit_type not in _UNIT_TYPES:
+            raise ValueError(f"Unknown unit type: {unit_type}") from None
+        raise ValueError(f"Unknown {unit_type} unit: {unit}") from None
 
 
 def convert_units(value: float, unit: str, unit_type: str) -> float:
     """Convert value to SI units."""
-    if unit_type not in UNIT_CONVERSIONS:
-        raise ValueError(f"Unknown unit type: {unit_type}")
-    if unit not in UNIT_CONVERSIONS[unit_type]:
-        raise ValueError(f"Unknown {unit_type} unit: {unit}")
-    return UNIT_CONVERSIONS[unit_type][unit](value)
+    scale, offset = _unit_factors(unit, unit_type)
+    return value * scale + offset
+
+
+def convert_from_si(value: float, unit: str, unit_type: str) -> float:
+    """Convert an SI value to the given unit (inverse of convert_units)."""
+    scale, offset = _unit_factors(unit, unit_type)
+    return (value - offset) / scale
+
+
+def _parse_composition(text: str) -> Dict[str, float]:
+    """
+    Parse a "Methane=0.70, Ethane=0.15" composition string.
+
+    Raises:
+        ValueError: If any entry is not of the form name=number
+    """
+    text = text.strip()
+    composition = {}
+    pos = 0
+    while pos < len(text):
+        match = _COMP_KV_RE.match(text, pos)
+        if match is None:
+            raise ValueError(f"Invalid composition entry: '{text[pos:].strip()}'")
+        composition[match.group(1)] = float(match.group(2))
+        pos = match.end()
+    return composition
 
 
 # ============================================================================
@@ -78,28 +152,56 @@ def convert_units(value: float, unit: str, unit_type: str) -> float:
 # ============================================================================
 
 class ProMaxState:
-    """Singleton state for ProMax COM session management."""
-
-    _instance: Optional["ProMaxState"] = None
-
-    def __new__(cls) -> "ProMaxState":
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    """
+    State for the ProMax COM session.
+
+    One instance is created at import time and shared through
+    get_promax_state(). Slots keep attribute access off the instance dict;
+    the tool bodies read these fields on every call.
+    """
+
+    __slots__ = (
+        "pmx", "project", "flowsheet", "visio", "vpage",
+        "stencils", "stream_shapes", "block_shapes", "with_gui",
+        "_stream_cache", "_phase_cache", "_prop_cache",
+        "_env_comp_names", "_env_comp_index", "_env_comp_key",
+        "_cell_cache", "_master_cache", "_comp_buffer", "_comp_zeros",
+        "_pstreams", "_env_components", "_solver",
+    )
 
     def __init__(self):
-        if not self._initialized:
-            self.pmx = None           # ProMax COM object
-            self.project = None       # Current project
-            self.flowsheet = None     # Current flowsheet
-            self.visio = None         # Visio application
-            self.vpage = None         # Visio page
-            self.stencils: Dict[str, Any] = {}
-            self.stream_shapes: Dict[str, Any] = {}
-            self.block_shapes: Dict[str, Any] = {}
-            self.with_gui = False
-            self._initialized = True
+        self.pmx = None           # ProMax COM object
+        self.project = None       # Current project
+        self.flowsheet = None     # Current flowsheet
+        self.visio = None         # Visio application
+        self.vpage = None         # Visio page
+        self.stencils: Dict[str, Any] = {}
+        self.stream_shapes: Dict[str, Any] = {}
+        self.block_shapes: Dict[str, Any] = {}
+        self.with_gui = False
+        # Resolved COM proxies, keyed by stream name / (stream, phase)
+        self._stream_cache: Dict[str, Any] = {}
+        self._phase_cache: Dict[Tuple[str, int], Any] = {}
+        self._prop_cache: Dict[Tuple[str, int, int], Any] = {}
+        # Environment component names and case-folded name -> index map,
+        # keyed by (flowsheet identity, component count) and invalidated
+        # by add_components
+        self._env_comp_names: Optional[List[str]] = None
+        self._env_comp_index: Dict[str, int] = {}
+        self._env_comp_key: Optional[Tuple[int, int]] = None
+        # Visio cells keyed by (id(shape), cell name); each entry holds its
+        # shape so the id cannot be reused by a recreated shape
+        self._cell_cache: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+        # Stencil masters keyed by (stencil name, master name)
+        self._master_cache: Dict[Tuple[str, str], Any] = {}
+        # Reusable mole-fraction buffer sized to the environment, plus a
+        # matching zero template used to clear it between writes
+        self._comp_buffer = array("d")
+        self._comp_zeros = array("d")
+        # Flowsheet collections resolved on first use
+        self._pstreams = None
+        self._env_components = None
+        self._solver = None
 
     def reset(self) -> None:
         """Reset state for new session."""
@@ -112,6 +214,164 @@ class ProMaxState:
         self.stream_shapes.clear()
         self.block_shapes.clear()
         self.with_gui = False
+        self.clear_caches()
+
+    def clear_caches(self) -> None:
+        """Drop cached COM proxies (call whenever the flowsheet changes)."""
+        self._stream_cache.clear()
+        self._phase_cache.clear()
+        self._prop_cache.clear()
+        self._cell_cache.clear()
+        self._master_cache.clear()
+        self._pstreams = None
+        self._env_components = None
+        self._solver = None
+        self.invalidate_env_components()
+
+    def invalidate_env_components(self) -> None:
+        """Force the environment component names to be re-read."""
+        self._env_comp_names = None
+        self._env_comp_index = {}
+        self._env_comp_key = None
+
+    def get_pstream(self, name: str) -> Any:
+        """Get a process stream, resolving it through COM only once."""
+        stream = self._stream_cache.get(name)
+        if stream is None:
+            stream = self.pstreams(name)
+            self._stream_cache[name] = stream
+        return stream
+
+    def cache_pstream(self, name: str, stream: Any) -> None:
+        """Remember a process stream proxy obtained elsewhere (e.g. on creation)."""
+        if stream is not None:
+            self._stream_cache[name] = stream
+
+    def get_phase(self, name: str, phase_id: int) -> Any:
+        """Get a stream phase, resolving it through COM only once."""
+        key = (name, phase_id)
+        phase = self._phase_cache.get(key)
+        if phase is None:
+            phase = self.get_pstream(name).Phases(phase_id)
+            self._phase_cache[key] = phase
+        return phase
+
+    def get_property(self, name: str, phase_id: int, prop_id: int) -> Any:
+        """Get a phase property object, resolving it through COM only once."""
+        key = (name, phase_id, prop_id)
+        prop = self._prop_cache.get(key)
+        if prop is None:
+            prop = self.get_phase(name, phase_id).Properties(prop_id)
+            self._prop_cache[key] = prop
+        return prop
+
+    def forget_stream(self, name: str) -> None:
+        """Drop cached stream, phase and property proxies for one stream."""
+        self._stream_cache.pop(name, None)
+        for key in [key for key in self._phase_cache if key[0] == name]:
+            del self._phase_cache[key]
+        for key in [key for key in self._prop_cache if key[0] == name]:
+            del self._prop_cache[key]
+
+    def get_cell(self, shape: Any, cell_name: str) -> Any:
+        """Get a Visio shape cell, resolving it only once."""
+        key = (id(shape), cell_name)
+        entry = self._cell_cache.get(key)
+        if entry is None:
+            entry = (shape, shape.Cells(cell_name))
+            self._cell_cache[key] = entry
+        return entry[1]
+
+    def get_master(self, stencil_name: str, master_name: str) -> Any:
+        """Get a Visio stencil master, resolving it only once."""
+        key = (stencil_name, master_name)
+        master = self._master_cache.get(key)
+        if master is None:
+            master = self.stencils[stencil_name].Masters(master_name)
+            self._master_cache[key] = master
+        return master
+
+    def get_env_component_names(self, components: Any, n_comps: int) -> List[str]:
+        """
+        Get environment component names in order.
+
+        Cached per flowsheet and component count, so switching flowsheets
+        or adding components forces a re-read.
+
+        Args:
+            components: The environment's Components collection
+            n_comps: Current component count (cache key)
+        """
+        key = (id(self.flowsheet), n_comps)
+        if self._env_comp_names is not None and self._env_comp_key == key:
+            return self._env_comp_names
+
+        names = []
+        for i in range(n_comps):
+            try:
+                names.append(components(i).Species.SpeciesName.Name)
+            except Exception:
+                names.append(f"Component_{i}")
+
+        self.set_env_component_names(names)
+        return names
+
+    def set_env_component_names(self, names: List[str]) -> None:
+        """Record the environment component order for the current flowsheet."""
+        self._env_comp_names = list(names)
+        self._env_comp_index = {n.lower(): i for i, n in enumerate(names)}
+        self._env_comp_key = (id(self.flowsheet), len(names))
+
+    def extend_env_components(self, names: List[str], n_comps: int) -> None:
+        """
+        Append newly added components to the recorded environment order.
+
+        Components.Add appends to the environment, so a recorded order
+        stays authoritative without walking the collection again. With
+        nothing recorded, or when the result does not account for every
+        component, the next composition write reads the order once.
+
+        Args:
+            names: Components whose Add succeeded, in call order
+            n_comps: Components.Count after the adds
+        """
+        if self._env_comp_names is None:
+            return
+        names = self._env_comp_names + list(names)
+        if len(names) != n_comps:
+            self.invalidate_env_components()
+            return
+        self.set_env_component_names(names)
+
+    def get_env_component_index(self, components: Any, n_comps: int) -> Dict[str, int]:
+        """Get a lower-cased component name -> environment index map."""
+        self.get_env_component_names(components, n_comps)
+        return self._env_comp_index
+
+    def get_env_component_count(self) -> int:
+        """
+        Get the environment component count.
+
+        Always one live Components.Count call: components can be added
+        outside add_components, and the recorded order is only reused by
+        get_env_component_names while its length matches this count.
+        """
+        return self.env_components.Count
+
+    def get_comp_buffer(self, n_comps: int) -> array:
+        """
+        Get a zeroed mole-fraction buffer of length n_comps.
+
+        The same buffer is handed out on every call and only reallocated
+        when the component count changes, so callers must copy it (e.g.
+        tuple()) before the next composition write.
+        """
+        if len(self._comp_buffer) != n_comps:
+            self._comp_zeros = array("d", [0.0]) * n_comps
+            self._comp_buffer = array("d", self._comp_zeros)
+        else:
+            self._comp_buffer[:] = self._comp_zeros
+        return self._comp_buffer
 
     @property
     def is_connected(self) -> bool:
@@ -123,6 +383,27 @@ class ProMaxState:
         """Check if a flowsheet is active."""
         return self.flowsheet is not None
 
+    @property
+    def pstreams(self) -> Any:
+        """The flowsheet's PStreams collection, resolved once per flowsheet."""
+        if self._pstreams is None:
+            self._pstreams = self.flowsheet.PStreams
+        return self._pstreams
+
+    @property
+    def env_components(self) -> Any:
+        """The environment's Components collection, resolved once per flowsheet."""
+        if self._env_components is None:
+            self._env_components = self.flowsheet.Environment.Components
+        return self._env_components
+
+    @property
+    def solver(self) -> Any:
+        """The flowsheet's Solver, resolved once per flowsheet."""
+        if self._solver is None:
+            self._solver = self.flowsheet.Solver
+        return self._solver
+
 
 # Global state instance
 _state = ProMaxState()
@@ -133,51 +414,248 @@ def get_promax_state() -> ProMaxState:
     return _state
 
 
+def _json_loads(text: str) -> Any:
+    """Parse a JSON string argument, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_dumps(data: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
 def _result(text: str) -> dict:
     """Helper to create MCP tool result format."""
     return {"content": [{"type": "text", "text": text}]}
 
 
+class _ToolError(Exception):
+    """Expected tool failure whose message is returned to the agent as-is."""
+
+
+def _dispatch(prog_id: str) -> Any:
+    """
+    Create a ProMax COM object, early-bound.
+
+    EnsureDispatch runs makepy when no wrapper module exists yet. Once the
+    module has been generated, plain Dispatch picks it up from the gencache,
+    so the typelib is only processed on the first connect of an install.
+    """
+    from win32com.client import Dispatch, gencache
+
+    if gencache.GetModuleForProgID(prog_id) is not None:
+        return Dispatch(prog_id)
+    return gencache.EnsureDispatch(prog_id)
+
+
+def _iter_collection(collection: Any):
+    """
+    Iterate a ProMax COM collection.
+
+    Uses the collection's enumerator when it exposes one, otherwise falls
+    back to zero-based indexing up to Count.
+    """
+    try:
+        return iter(collection)
+    except TypeError:
+        return (collection(i) for i in range(collection.Count))
+
+
+@contextmanager
+def _visio_batch(state: ProMaxState, label: str):
+    """
+    Group a burst of Visio edits into one undo entry and one repaint.
+
+    Screen updating is suspended for the duration and restored even if an
+    edit fails. Visio events stay enabled: ProMax creates its streams and
+    blocks from the shape-added and glue events. Does nothing in background
+    mode.
+    """
+    visio = state.visio
+    if not (state.with_gui and visio):
+        yield
+        return
+
+    visio.ScreenUpdating = False
+    scope_id = visio.BeginUndoScope(label)
+    try:
+        yield
+    finally:
+        visio.EndUndoScope(scope_id, True)
+        visio.ScreenUpdating = True
+
+
+def _load_stencils(state: ProMaxState) -> None:
+    """Register the open Visio stencil documents and resolve their masters."""
+    state.stencils.clear()
+    # Enumerate the collection instead of indexing Documents(i) per document
+    for doc in state.visio.Documents:
+        if doc.Type == 2:  # Stencil
+            state.stencils[doc.Name] = doc
+
+    # Resolve every known master now, so creating shapes later needs no
+    # Masters() lookup and a missing master shows up at project load
+    for stencil_name, master_name in (STREAM_MASTER, *BLOCK_STENCILS.values()):
+        if stencil_name not in state.stencils:
+            continue
+        try:
+            state.get_master(stencil_name, master_name)
+        except Exception as e:
+            logger.warning("Master '%s' not found in %s: %s", master_name, stencil_name, e)
+
+
+# Single persistent STA thread that owns every ProMax/Visio COM object.
+# Work items are (fn, args, future) tuples.
+_com_queue: "queue.SimpleQueue[Tuple[Callable[[dict], dict], dict, Future]]" = queue.SimpleQueue()
+_com_thread: Optional[threading.Thread] = None
+_com_thread_lock = threading.Lock()
+# Set when shutdown timed out: the old thread still drains the queue, so no
+# second thread may start until it has exited
+_com_stopping = False
+
+
+def _init_com_thread() -> None:
+    """Enter a single-threaded apartment on the COM worker thread."""
+    try:
+        import pythoncom
+        pythoncom.CoInitialize()
+    except ImportError as e:
+        logger.warning("pywin32 not available, COM not initialized: %s", e)
+
+
+def _com_loop() -> None:
+    """Run queued tool bodies on the COM thread until a None item arrives."""
+    _init_com_thread()
+    try:
+        while True:
+            item = _com_queue.get()
+            if item is None:
+                break
+            fn, args, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(args))
+            except BaseException as e:
+                future.set_exception(e)
+    finally:
+        try:
+            import pythoncom
+            pythoncom.CoUninitialize()
+        except ImportError:
+            pass
+
+
+def _ensure_com_thread() -> None:
+    """Start the COM thread on first use, or after a shutdown has finished."""
+    global _com_thread, _com_stopping
+    if _com_thread is not None and not _com_stopping:
+        return
+    with _com_thread_lock:
+        if _com_stopping:
+            if _com_thread.is_alive():
+                raise RuntimeError("COM worker thread is still shutting down")
+            _com_thread = None
+            _com_stopping = False
+        if _com_thread is None:
+            thread = threading.Thread(target=_com_loop, name="promax-com", daemon=True)
+            thread.start()
+            _com_thread = thread
+
+
+async def _run_com(fn: Callable[[dict], dict], args: dict) -> dict:
+    """Run a tool body on the COM thread and await its result."""
+    _ensure_com_thread()
+    future: Future = Future()
+    _com_queue.put((fn, args, future))
+    return await asyncio.wrap_future(future)
+
+
+def shutdown_com_thread(timeout: float = 10.0) -> None:
+    """
+    Stop the COM thread after queued work drains and leave its apartment.
+
+    If the thread outlives the timeout it stays registered, and new work is
+    refused until it exits, so COM objects never span two apartments.
+    """
+    global _com_thread, _com_stopping
+    with _com_thread_lock:
+        thread = _com_thread
+        if thread is None:
+            return
+        if not _com_stopping:
+            _com_queue.put(None)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("COM worker thread did not stop in time")
+            _com_stopping = True
+            return
+        _com_thread = None
+        _com_stopping = False
+
+
+def _sync_tool(name: str, description: str, input_schema: dict):
+    """
+    Register a synchronous tool body with the Agent SDK.
+
+    The SDK only accepts coroutine handlers, but the ProMax tools are plain
+    COM calls with nothing to await. The body stays a regular function and
+    runs on the COM worker thread, so long calls such as Solve, Flash and
+    SaveAs do not block the event loop. Every COM object is created and used
+    on that one thread, which keeps the apartment rules intact.
+    """
+    def decorator(fn: Callable[[dict], dict]):
+        @functools.wraps(fn)
+        async def handler(args: dict) -> dict:
+            return await _run_com(fn, args)
+
+        return tool(name, description, input_schema)(handler)
+
+    return decorator
+
+
 # ============================================================================
-# MCP Tool Definitions using @tool decorator
+# MCP Tool Definitions using @_sync_tool decorator
 # ============================================================================
 
-@tool(
+@_sync_tool(
     "connect_promax",
     "Initialize connection to ProMax COM API. MUST be called first before any other ProMax operation.",
     {"with_gui": bool}
 )
-async def connect_promax_tool(args: dict) -> dict:
+def connect_promax_tool(args: dict) -> dict:
     """Connect to ProMax COM server."""
     state = get_promax_state()
     try:
-        from win32com.client import gencache
-
         with_gui = args.get("with_gui", True)
 
         if with_gui:
-            state.pmx = gencache.EnsureDispatch("ProMax.ProMaxOutOfProc")
+            state.pmx = _dispatch("ProMax.ProMaxOutOfProc")
             state.with_gui = True
         else:
-            state.pmx = gencache.EnsureDispatch("ProMax.ProMax")
+            state.pmx = _dispatch("ProMax.ProMax")
             state.with_gui = False
 
         version = f"{state.pmx.Version.Major}.{state.pmx.Version.Minor}"
         mode = "GUI" if with_gui else "background"
-        logger.info(f"Connected to ProMax {version} ({mode} mode)")
+        logger.info("Connected to ProMax %s (%s mode)", version, mode)
         return _result(f"Connected to ProMax {version} ({mode} mode)")
 
     except Exception as e:
-        logger.error(f"Failed to connect to ProMax: {e}")
+        logger.error("Failed to connect to ProMax: %s", e)
         return _result(f"Error: Failed to connect to ProMax: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "create_project",
     "Create a new ProMax project with a flowsheet",
     {"flowsheet_name": str}
 )
-async def create_project_tool(args: dict) -> dict:
+def create_project_tool(args: dict) -> dict:
     """Create a new ProMax project."""
     state = get_promax_state()
 
@@ -188,30 +666,29 @@ async def create_project_tool(args: dict) -> dict:
         flowsheet_name = args.get("flowsheet_name", "Main")
         state.project = state.pmx.New()
         state.flowsheet = state.project.Flowsheets.Add(flowsheet_name)
+        state.clear_caches()
+        # A new flowsheet starts with an empty environment
+        state.set_env_component_names([])
 
         if state.with_gui:
             state.visio = state.pmx.VisioApp
             state.vpage = state.flowsheet.VisioPage
-            # Load stencils
-            for i in range(1, state.visio.Documents.Count + 1):
-                doc = state.visio.Documents(i)
-                if doc.Type == 2:  # Stencil
-                    state.stencils[doc.Name] = doc
+            _load_stencils(state)
 
-        logger.info(f"Created project with flowsheet '{flowsheet_name}'")
+        logger.info("Created project with flowsheet '%s'", flowsheet_name)
         return _result(f"Created project with flowsheet '{flowsheet_name}'")
 
     except Exception as e:
-        logger.error(f"Failed to create project: {e}")
+        logger.error("Failed to create project: %s", e)
         return _result(f"Error: Failed to create project: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "add_components",
     "Add chemical components to the flowsheet environment. Components must be added before setting stream compositions.",
     {"components": list}
 )
-async def add_components_tool(args: dict) -> dict:
+def add_components_tool(args: dict) -> dict:
     """Add components to environment."""
     state = get_promax_state()
 
@@ -229,17 +706,31 @@ async def add_components_tool(args: dict) -> dict:
             else:
                 components = [components]
 
-        env = state.flowsheet.Environment
+        # Drop blanks and repeats up front; each Add is a blocking COM call
+        # and a repeated name would only fail inside ProMax
+        seen = set()
+        unique = []
+        for comp in components:
+            key = comp.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(comp.strip())
+        components = unique
+
+        env_components = state.env_components
         added = []
         failed = []
 
         for comp in components:
             try:
-                env.Components.Add(comp)
+                env_components.Add(comp)
                 added.append(comp)
             except Exception as e:
                 failed.append(f"{comp}: {str(e)}")
 
+        if added:
+            state.extend_env_components(added, env_components.Count)
+
         result = f"Added {len(added)} components: {', '.join(added)}"
         if failed:
             result += f"\nFailed: {'; '.join(failed)}"
@@ -248,16 +739,50 @@ async def add_components_tool(args: dict) -> dict:
         return _result(result)
 
     except Exception as e:
-        logger.error(f"Failed to add components: {e}")
+        logger.error("Failed to add components: %s", e)
         return _result(f"Error: Failed to add components: {str(e)}")
 
 
-@tool(
+def _create_stream(state: ProMaxState, args: dict) -> str:
+    """Create a process stream; returns the result message."""
+    name = args.get("name")
+    # A recreated stream must not reuse proxies of the one it replaces
+    state.forget_stream(name)
+    # Canvas is 297mm x 210mm (A4 landscape). Default to left-center region for feed streams.
+    x = args.get("x", 50.0)
+    y = args.get("y", 105.0)
+
+    if state.with_gui and state.vpage:
+        stencil_name, master_name = STREAM_MASTER
+        if stencil_name not in state.stencils:
+            raise _ToolError(f"Error: Stencil '{stencil_name}' not loaded.")
+
+        # Convert mm to inches for Visio Drop() method
+        # Visio uses inches internally, not the page's display units
+        x_inches = x * _MM_TO_IN
+        y_inches = y * _MM_TO_IN
+
+        master = state.get_master(stencil_name, master_name)
+        shape = state.vpage.Drop(master, x_inches, y_inches)
+        shape.Name = name
+        state.stream_shapes[name] = shape
+
+        logger.info("Created stream '%s' at (%s, %s) mm = (%.2f, %.2f) inches", name, x, y, x_inches, y_inches)
+        return f"Created stream '{name}' with Visio shape at ({x}, {y}) mm"
+    else:
+        # CreatePStream returns the new PStream; seed the cache with it so
+        # the following property/composition/flash calls skip the lookup
+        state.cache_pstream(name, state.flowsheet.CreatePStream(name))
+        logger.info("Created stream '%s' (data only)", name)
+        return f"Created stream '{name}' (data only)"
+
+
+@_sync_tool(
     "create_stream",
     "Create a new process stream in the flowsheet. Canvas is 297mm x 210mm (A4 landscape). Position x=0-297, y=0-210.",
     {"name": str, "x": float, "y": float}
 )
-async def create_stream_tool(args: dict) -> dict:
+def create_stream_tool(args: dict) -> dict:
     """Create a process stream."""
     state = get_promax_state()
 
@@ -265,44 +790,45 @@ async def create_stream_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        name = args.get("name")
-        # Canvas is 297mm x 210mm (A4 landscape). Default to left-center region for feed streams.
-        x = args.get("x", 50.0)
-        y = args.get("y", 105.0)
-
-        if state.with_gui and state.vpage:
-            stencil_name = "Streams.vss"
-            if stencil_name not in state.stencils:
-                return _result(f"Error: Stencil '{stencil_name}' not loaded.")
-
-            # Convert mm to inches for Visio Drop() method
-            # Visio uses inches internally, not the page's display units
-            x_inches = x / 25.4
-            y_inches = y / 25.4
-
-            master = state.stencils[stencil_name].Masters("Process Stream")
-            shape = state.vpage.Drop(master, x_inches, y_inches)
-            shape.Name = name
-            state.stream_shapes[name] = shape
-
-            logger.info(f"Created stream '{name}' at ({x}, {y}) mm = ({x_inches:.2f}, {y_inches:.2f}) inches")
-            return _result(f"Created stream '{name}' with Visio shape at ({x}, {y}) mm")
-        else:
-            state.flowsheet.CreatePStream(name)
-            logger.info(f"Created stream '{name}' (data only)")
-            return _result(f"Created stream '{name}' (data only)")
+        return _result(_create_stream(state, args))
 
+    except _ToolError as e:
+        return _result(str(e))
     except Exception as e:
-        logger.error(f"Failed to create stream: {e}")
+        logger.error("Failed to create stream: %s", e)
         return _result(f"Error: Failed to create stream: {str(e)}")
 
 
-@tool(
+def _set_stream_properties(state: ProMaxState, args: dict) -> str:
+    """Set stream T/P/flow; returns the result message."""
+    name = args.get("stream_name")
+    writes = []
+    set_props = []
+
+    # One dict lookup per argument; absent and null are treated alike
+    for key, unit, unit_type, prop_id, label in STREAM_PROPERTY_ARGS:
+        value = args.get(key)
+        if value is None:
+            continue
+        writes.append((prop_id, convert_units(value, unit, unit_type)))
+        set_props.append(label.format(value))
+
+    # ProMax has no bulk property setter, so write through cached
+    # property objects: one COM call per value instead of three.
+    for prop_id, value in writes:
+        state.get_property(name, PMX_TOTAL_PHASE, prop_id).Value = value
+
+    result = f"Set {name} properties: {', '.join(set_props)}"
+    logger.info(result)
+    return result
+
+
+@_sync_tool(
     "set_stream_properties",
     "Set physical properties of a process stream (temperature, pressure, flow rate)",
     {"stream_name": str, "temperature_c": float, "pressure_kpa": float, "molar_flow_kmol_hr": float}
 )
-async def set_stream_properties_tool(args: dict) -> dict:
+def set_stream_properties_tool(args: dict) -> dict:
     """Set stream properties."""
     state = get_promax_state()
 
@@ -310,41 +836,99 @@ async def set_stream_properties_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        name = args.get("stream_name")
-        stream = state.flowsheet.PStreams(name)
-        phase = stream.Phases(PMX_TOTAL_PHASE)
-        set_props = []
-
-        if "temperature_c" in args and args["temperature_c"] is not None:
-            temp_k = convert_units(args["temperature_c"], "C", "temperature")
-            phase.Properties(PHASE_PROPS["temperature"]).Value = temp_k
-            set_props.append(f"T={args['temperature_c']}°C")
-
-        if "pressure_kpa" in args and args["pressure_kpa"] is not None:
-            pres_pa = convert_units(args["pressure_kpa"], "kPa", "pressure")
-            phase.Properties(PHASE_PROPS["pressure"]).Value = pres_pa
-            set_props.append(f"P={args['pressure_kpa']}kPa")
-
-        if "molar_flow_kmol_hr" in args and args["molar_flow_kmol_hr"] is not None:
-            flow_si = convert_units(args["molar_flow_kmol_hr"], "kmol/hr", "flow")
-            phase.Properties(PHASE_PROPS["molar_flow"]).Value = flow_si
-            set_props.append(f"F={args['molar_flow_kmol_hr']}kmol/hr")
-
-        result = f"Set {name} properties: {', '.join(set_props)}"
-        logger.info(result)
-        return _result(result)
+        return _result(_set_stream_properties(state, args))
 
     except Exception as e:
-        logger.error(f"Failed to set stream properties: {e}")
+        logger.error("Failed to set stream properties: %s", e)
         return _result(f"Error: Failed to set stream properties: {str(e)}")
 
 
-@tool(
+def _match_composition(
+    env_comp_index: Dict[str, int],
+    items: List[Tuple[str, float]],
+    comp_values: Any,
+) -> Tuple[List[str], List[str]]:
+    """
+    Place (name, fraction) pairs into an environment-ordered buffer.
+
+    Args:
+        env_comp_index: Lower-cased component name -> environment index
+        items: User component names and mole fractions
+        comp_values: Zeroed buffer, one slot per environment component
+
+    Returns:
+        (matched names, unmatched names)
+    """
+    lookup = env_comp_index.get
+    matched = []
+    unmatched = []
+    for user_name, value in items:
+        i = lookup(user_name.lower())
+        if i is None:
+            unmatched.append(user_name)
+        else:
+            comp_values[i] = value
+            matched.append(user_name)
+    return matched, unmatched
+
+
+def _set_stream_composition(state: ProMaxState, args: dict) -> str:
+    """Set stream mole fractions; returns the result message."""
+    name = args.get("stream_name")
+    composition = args.get("composition", {})
+
+    # Handle various string formats Claude might send
+    if isinstance(composition, str):
+        # Try JSON first: "{\"Hydrogen\": 0.446}"
+        if composition.strip().startswith('{'):
+            composition = _json_loads(composition)
+        else:
+            # Handle key=value format: "Methane=0.70, Ethane=0.15"
+            composition = _parse_composition(composition)
+
+    # Validate composition sums to 1.0 (fsum: exact, order-independent)
+    items = [(user_name, float(value)) for user_name, value in composition.items()]
+    total = math.fsum(value for _, value in items)
+    if abs(total - 1.0) > 0.001:
+        raise _ToolError(f"Error: Composition must sum to 1.0, got {total:.4f}")
+    if total != 1.0:
+        # Absorb rounding drift so ProMax receives an exactly normalized vector
+        items = [(user_name, value / total) for user_name, value in items]
+
+    components = state.env_components
+    n_comps = state.get_env_component_count()
+
+    if n_comps == 0:
+        raise _ToolError("Error: No components in environment. Add components first.")
+
+    # Get environment component names in order (walked only after changes)
+    env_comp_index = state.get_env_component_index(components, n_comps)
+
+    # Build composition array matching environment order (case-insensitive)
+    comp_values = state.get_comp_buffer(n_comps)
+    matched, unmatched = _match_composition(env_comp_index, items, comp_values)
+
+    # Set composition
+    phase = state.get_phase(name, PMX_TOTAL_PHASE)
+    comp_obj = phase.Composition(PMX_MOLAR_FRAC_BASIS)
+    # SIValues only accepts a tuple (see docs/promax_com_api_reference.md);
+    # tuple() also copies the reused buffer
+    comp_obj.SIValues = tuple(comp_values)
+
+    result = f"Set {name} composition ({len(matched)} components)"
+    if unmatched:
+        result += f"\nWarning: Unmatched components: {', '.join(unmatched)}"
+
+    logger.info(result)
+    return result
+
+
+@_sync_tool(
     "set_stream_composition",
     "Set the mole fraction composition of a stream. Composition values must sum to 1.0.",
     {"stream_name": str, "composition": dict}
 )
-async def set_stream_composition_tool(args: dict) -> dict:
+def set_stream_composition_tool(args: dict) -> dict:
     """Set stream composition."""
     state = get_promax_state()
 
@@ -352,83 +936,29 @@ async def set_stream_composition_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        name = args.get("stream_name")
-        composition = args.get("composition", {})
-
-        # Handle various string formats Claude might send
-        if isinstance(composition, str):
-            # Try JSON first: "{\"Hydrogen\": 0.446}"
-            if composition.strip().startswith('{'):
-                composition = json.loads(composition)
-            else:
-                # Handle key=value format: "Methane=0.70, Ethane=0.15"
-                composition = dict(
-                    item.split('=') for item in composition.split(',')
-                )
-                # Convert string values to float
-                composition = {k.strip(): float(v) for k, v in composition.items()}
-
-        # Validate composition sums to 1.0
-        total = sum(composition.values())
-        if abs(total - 1.0) > 0.001:
-            return _result(f"Error: Composition must sum to 1.0, got {total:.4f}")
-
-        stream = state.flowsheet.PStreams(name)
-        env = state.flowsheet.Environment
-        n_comps = env.Components.Count
-
-        if n_comps == 0:
-            return _result("Error: No components in environment. Add components first.")
-
-        # Get environment component names in order
-        env_comp_names = []
-        for i in range(n_comps):
-            try:
-                comp = env.Components(i)
-                pmx_name = comp.Species.SpeciesName.Name
-                env_comp_names.append(pmx_name)
-            except Exception:
-                env_comp_names.append(f"Component_{i}")
-
-        # Build composition array matching environment order (case-insensitive)
-        comp_values = [0.0] * n_comps
-        matched = []
-        unmatched = []
-
-        for user_name, value in composition.items():
-            found = False
-            for i, pmx_name in enumerate(env_comp_names):
-                if user_name.lower() == pmx_name.lower():
-                    comp_values[i] = value
-                    matched.append(user_name)
-                    found = True
-                    break
-            if not found:
-                unmatched.append(user_name)
-
-        # Set composition
-        phase = stream.Phases(PMX_TOTAL_PHASE)
-        comp_obj = phase.Composition(PMX_MOLAR_FRAC_BASIS)
-        comp_obj.SIValues = tuple(comp_values)
-
-        result = f"Set {name} composition ({len(matched)} components)"
-        if unmatched:
-            result += f"\nWarning: Unmatched components: {', '.join(unmatched)}"
-
-        logger.info(result)
-        return _result(result)
+        return _result(_set_stream_composition(state, args))
 
+    except _ToolError as e:
+        return _result(str(e))
     except Exception as e:
-        logger.error(f"Failed to set composition: {e}")
+        logger.error("Failed to set composition: %s", e)
         return _result(f"Error: Failed to set composition: {str(e)}")
 
 
-@tool(
+def _flash_stream(state: ProMaxState, args: dict) -> str:
+    """Flash a stream; returns the result message."""
+    name = args.get("stream_name")
+    state.get_pstream(name).Flash()
+    logger.info("Flash completed for stream '%s'", name)
+    return f"Flash calculation completed for '{name}'"
+
+
+@_sync_tool(
     "flash_stream",
     "Flash a stream to establish thermodynamic equilibrium. Call after setting T, P, and composition.",
     {"stream_name": str}
 )
-async def flash_stream_tool(args: dict) -> dict:
+def flash_stream_tool(args: dict) -> dict:
     """Flash a stream."""
     state = get_promax_state()
 
@@ -436,23 +966,93 @@ async def flash_stream_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        name = args.get("stream_name")
-        stream = state.flowsheet.PStreams(name)
-        stream.Flash()
-        logger.info(f"Flash completed for stream '{name}'")
-        return _result(f"Flash calculation completed for '{name}'")
+        return _result(_flash_stream(state, args))
 
     except Exception as e:
-        logger.error(f"Flash failed: {e}")
+        logger.error("Flash failed: %s", e)
         return _result(f"Error: Flash calculation failed: {str(e)}")
 
 
-@tool(
+@_sync_tool(
+    "create_configured_stream",
+    "Create a stream, optionally connect it to a block (GUI mode), set its conditions and composition in one call, then flash it. Canvas is 297mm x 210mm. Position in mm.",
+    # Explicit schema: the dict shorthand marks every key required, but only
+    # the name and position are; the rest select which steps run
+    {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "x": {"type": "number"},
+            "y": {"type": "number"},
+            "block_name": {"type": "string"},
+            "connection_point": {"type": "integer"},
+            "is_inlet": {"type": "boolean"},
+            "temperature_c": {"type": "number"},
+            "pressure_kpa": {"type": "number"},
+            "molar_flow_kmol_hr": {"type": "number"},
+            "composition": {"type": "object"},
+            "flash": {"type": "boolean"},
+        },
+        "required": ["name", "x", "y"],
+    }
+)
+def create_configured_stream_tool(args: dict) -> dict:
+    """Create, connect, specify and flash a stream in one tool call."""
+    state = get_promax_state()
+
+    if not state.has_flowsheet:
+        return _result("Error: No flowsheet. Create a project first.")
+
+    stream_args = dict(args, stream_name=args.get("name"))
+    steps = [("create stream", _create_stream)]
+    if args.get("block_name"):
+        steps.append(("connect stream", _connect_stream))
+    if any(args.get(key) is not None for key, *_ in STREAM_PROPERTY_ARGS):
+        steps.append(("set stream properties", _set_stream_properties))
+    if args.get("composition"):
+        steps.append(("set composition", _set_stream_composition))
+    if args.get("flash", True):
+        steps.append(("flash stream", _flash_stream))
+
+    lines = []
+    for step, func in steps:
+        try:
+            lines.append(func(state, stream_args))
+        except _ToolError as e:
+            lines.append(str(e))
+            break
+        except Exception as e:
+            logger.error("Failed to %s: %s", step, e)
+            lines.append(f"Error: Failed to {step}: {str(e)}")
+            break
+
+    return _result("\n".join(lines))
+
+
+def _stream_results(state: ProMaxState, name: str) -> dict:
+    """Read T/P/flow for one stream, converted to display units."""
+    # ProMax has no bulk property read; reuse the cached property
+    # objects so each value is a single .Value call
+    temp_k, pres_pa, molar_flow = (
+        state.get_property(name, PMX_TOTAL_PHASE, prop_id).Value
+        for prop_id in RESULT_PROPS
+    )
+
+    return {
+        "stream_name": name,
+        "temperature_c": convert_from_si(temp_k, "C", "temperature") if temp_k else None,
+        "pressure_kpa": convert_from_si(pres_pa, "kPa", "pressure") if pres_pa else None,
+        "molar_flow_kmol_hr": convert_from_si(molar_flow, "kmol/hr", "flow") if molar_flow else None,
+    }
+
+
+@_sync_tool(
     "get_stream_results",
-    "Get simulation results for a stream (temperature, pressure, flow, vapor fraction)",
+    "Get simulation results for a stream (temperature, pressure, flow, vapor fraction). "
+    "Pass several comma-separated stream names to read them all in one call.",
     {"stream_name": str}
 )
-async def get_stream_results_tool(args: dict) -> dict:
+def get_stream_results_tool(args: dict) -> dict:
     """Get stream results."""
     state = get_promax_state()
 
@@ -460,35 +1060,29 @@ async def get_stream_results_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        name = args.get("stream_name")
-        stream = state.flowsheet.PStreams(name)
-        phase = stream.Phases(PMX_TOTAL_PHASE)
-
-        temp_k = phase.Properties(PHASE_PROPS["temperature"]).Value
-        pres_pa = phase.Properties(PHASE_PROPS["pressure"]).Value
-        molar_flow = phase.Properties(PHASE_PROPS["molar_flow"]).Value
+        stream_name = args.get("stream_name")
+        if "," in stream_name:
+            names = [name.strip() for name in stream_name.split(",") if name.strip()]
+        else:
+            names = [stream_name]
 
-        results = {
-            "stream_name": name,
-            "temperature_c": temp_k - 273.15 if temp_k else None,
-            "pressure_kpa": pres_pa / 1000 if pres_pa else None,
-            "molar_flow_kmol_hr": molar_flow * 3600 / 1000 if molar_flow else None,
-        }
+        results = [_stream_results(state, name) for name in names]
 
-        logger.info(f"Retrieved results for stream '{name}'")
-        return _result(json.dumps(results, indent=2))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Retrieved results for stream(s): %s", ", ".join(names))
+        return _result(_json_dumps(results[0] if len(results) == 1 else results))
 
     except Exception as e:
-        logger.error(f"Failed to get stream results: {e}")
+        logger.error("Failed to get stream results: %s", e)
         return _result(f"Error: Failed to get stream results: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "run_simulation",
     "Run the flowsheet solver to calculate all blocks and streams",
     {}
 )
-async def run_simulation_tool(args: dict) -> dict:
+def run_simulation_tool(args: dict) -> dict:
     """Run flowsheet solver."""
     state = get_promax_state()
 
@@ -496,7 +1090,7 @@ async def run_simulation_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        solver = state.flowsheet.Solver
+        solver = state.solver
         solver.Solve()
 
         status_code = solver.LastSolverExecStatus
@@ -504,20 +1098,20 @@ async def run_simulation_tool(args: dict) -> dict:
             logger.info("Simulation converged")
             return _result("Simulation converged successfully")
         else:
-            logger.warning(f"Simulation did not converge. Status: {status_code}")
+            logger.warning("Simulation did not converge. Status: %s", status_code)
             return _result(f"Simulation did not converge. Status code: {status_code}")
 
     except Exception as e:
-        logger.error(f"Simulation failed: {e}")
+        logger.error("Simulation failed: %s", e)
         return _result(f"Error: Simulation failed: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "save_project",
     "Save the current project to a .pmx file",
     {"filepath": str}
 )
-async def save_project_tool(args: dict) -> dict:
+def save_project_tool(args: dict) -> dict:
     """Save project to file."""
     state = get_promax_state()
 
@@ -527,20 +1121,20 @@ async def save_project_tool(args: dict) -> dict:
     try:
         filepath = args.get("filepath")
         state.project.SaveAs(filepath)
-        logger.info(f"Project saved to: {filepath}")
+        logger.info("Project saved to: %s", filepath)
         return _result(f"Project saved to: {filepath}")
 
     except Exception as e:
-        logger.error(f"Failed to save project: {e}")
+        logger.error("Failed to save project: %s", e)
         return _result(f"Error: Failed to save project: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "close_project",
     "Close the current ProMax project",
     {}
 )
-async def close_project_tool(args: dict) -> dict:
+def close_project_tool(args: dict) -> dict:
     """Close project."""
     state = get_promax_state()
 
@@ -554,16 +1148,16 @@ async def close_project_tool(args: dict) -> dict:
         return _result("Project closed successfully")
 
     except Exception as e:
-        logger.error(f"Failed to close project: {e}")
+        logger.error("Failed to close project: %s", e)
         return _result(f"Error: Failed to close project: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "open_project",
     "Open an existing ProMax project file (.pmx)",
     {"filepath": str}
 )
-async def open_project_tool(args: dict) -> dict:
+def open_project_tool(args: dict) -> dict:
     """Open an existing ProMax project."""
     state = get_promax_state()
 
@@ -573,6 +1167,7 @@ async def open_project_tool(args: dict) -> dict:
     try:
         filepath = args.get("filepath")
         state.project = state.pmx.Open(filepath)
+        state.clear_caches()
 
         # Get first flowsheet if exists
         if state.project.Flowsheets.Count > 0:
@@ -581,22 +1176,18 @@ async def open_project_tool(args: dict) -> dict:
             if state.with_gui:
                 state.visio = state.pmx.VisioApp
                 state.vpage = state.flowsheet.VisioPage
-                # Load stencils
-                for i in range(1, state.visio.Documents.Count + 1):
-                    doc = state.visio.Documents(i)
-                    if doc.Type == 2:  # Stencil
-                        state.stencils[doc.Name] = doc
+                _load_stencils(state)
 
-        logger.info(f"Opened project: {filepath}")
+        logger.info("Opened project: %s", filepath)
         return _result(f"Opened project: {filepath} (flowsheets: {state.project.Flowsheets.Count})")
 
     except Exception as e:
-        logger.error(f"Failed to open project: {e}")
+        logger.error("Failed to open project: %s", e)
         return _result(f"Error: Failed to open project: {str(e)}")
 
 
 # Block type constants (pmxBlockTypesEnum)
-BLOCK_TYPES = {
+BLOCK_TYPES = MappingProxyType({
     "separator": 12,        # pmxSeparatorBlock
     "staged_column": 15,    # pmxStagedColumnBlock (Amine Treater, Distillation)
     "mixer": 5,             # pmxMixerSplitterBlock
@@ -607,10 +1198,10 @@ BLOCK_TYPES = {
     "reactor": 18,          # pmxReactorBlock
     "divider": 2,           # pmxDividerBlock
     "pipeline": 7,          # pmxPipelineBlock
-}
+})
 
 # Stencil and master shape mappings for GUI mode
-BLOCK_STENCILS = {
+BLOCK_STENCILS = MappingProxyType({
     "separator": ("Separators.vss", "2 Phase Separator - Vertical"),
     "separator_3phase": ("Separators.vss", "3 Phase Separator"),
     "staged_column": ("Column.vss", "Distill"),
@@ -619,15 +1210,103 @@ BLOCK_STENCILS = {
     "compressor": ("Fluid Drivers.vss", "Compressor"),
     "heat_exchanger": ("Exchangers.vss", "Shell and Tube Exchanger"),
     "valve": ("Valves.vss", "JT Valve"),
-}
+})
+
+# ProcAgent BlockType value -> create_block type plus its stencil/master
+BLOCK_TYPE_MAP = MappingProxyType({
+    block_type.value: MappingProxyType({
+        "block_type": key,
+        "stencil": BLOCK_STENCILS[key][0],
+        "master": BLOCK_STENCILS[key][1],
+    })
+    for block_type, key in (
+        (BlockType.AMINE_TREATER, "staged_column"),
+        (BlockType.SEPARATOR, "separator"),
+        (BlockType.HEAT_EXCHANGER, "heat_exchanger"),
+        (BlockType.COMPRESSOR, "compressor"),
+        (BlockType.PUMP, "pump"),
+        (BlockType.VALVE, "valve"),
+        (BlockType.MIXER, "mixer"),
+        (BlockType.SPLITTER, "mixer"),  # pmxMixerSplitterBlock covers both
+    )
+})
+
+# Lower-cased BlockType values accepted by create_block as aliases
+_BLOCK_ALIASES = {name.lower(): info["block_type"] for name, info in BLOCK_TYPE_MAP.items()}
+
+# Visio connection-point cell names, indexed by connection_point - 1
+CONNECTION_CELLS = tuple(f"Connections.X{i}" for i in range(1, 9))
+
+
+def _block_type_arg(args: dict) -> str:
+    """Normalize the block_type argument, accepting BlockType values."""
+    block_type = args.get("block_type", "separator").lower()
+    return _BLOCK_ALIASES.get(block_type, block_type)
+
+
+def _block_master(state: ProMaxState, block_type: str) -> Any:
+    """Get the Visio master for a block type, raising _ToolError if unavailable."""
+    try:
+        stencil_name, master_name = BLOCK_STENCILS[block_type]
+    except KeyError:
+        available = ", ".join(BLOCK_STENCILS.keys())
+        raise _ToolError(f"Error: Unknown block type '{block_type}'. Available: {available}") from None
+    if stencil_name not in state.stencils:
+        raise _ToolError(f"Error: Stencil '{stencil_name}' not loaded.")
+    return state.get_master(stencil_name, master_name)
+
+
+def _register_block_shape(state: ProMaxState, shape: Any, name: Optional[str]) -> str:
+    """Track a dropped block shape by its ProMax name and the user's name."""
+    # ProMax auto-generates block name, but we track the shape
+    block_name = shape.Name
+    state.block_shapes[block_name] = shape
+
+    # Also track by user-provided name for connection convenience
+    if name:
+        state.block_shapes[name] = shape
+    return block_name
+
+
+def _create_block(state: ProMaxState, args: dict) -> str:
+    """Create a unit operation block; returns the result message."""
+    block_type = _block_type_arg(args)
+    name = args.get("name")
+    # Default to center of canvas
+    x = args.get("x", 150.0)
+    y = args.get("y", 105.0)
+
+    if state.with_gui and state.vpage:
+        # GUI mode: Drop shape from stencil
+        master = _block_master(state, block_type)
+
+        # Convert mm to inches for Visio
+        x_inches = x * _MM_TO_IN
+        y_inches = y * _MM_TO_IN
+
+        shape = state.vpage.Drop(master, x_inches, y_inches)
+        block_name = _register_block_shape(state, shape, name)
+
+        logger.info("Created %s block '%s' at (%s, %s) mm", block_type, block_name, x, y)
+        return f"Created {block_type} block '{block_name}' at ({x}, {y}) mm"
+    else:
+        # Background mode: Create block via COM API
+        try:
+            type_id = BLOCK_TYPES[block_type]
+        except KeyError:
+            available = ", ".join(BLOCK_TYPES.keys())
+            raise _ToolError(f"Error: Unknown block type '{block_type}'. Available: {available}") from None
+        state.flowsheet.Blocks.Add(type_id, name)
+        logger.info("Created %s block '%s' (data only)", block_type, name)
+        return f"Created {block_type} block '{name}' (data only)"
 
 
-@tool(
+@_sync_tool(
     "create_block",
     "Create a unit operation block (separator, column, mixer, pump, etc.). Canvas is 297mm x 210mm. Position in mm.",
     {"block_type": str, "name": str, "x": float, "y": float}
 )
-async def create_block_tool(args: dict) -> dict:
+def create_block_tool(args: dict) -> dict:
     """Create a unit operation block."""
     state = get_promax_state()
 
@@ -635,64 +1314,187 @@ async def create_block_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        block_type = args.get("block_type", "separator").lower()
-        name = args.get("name")
-        # Default to center of canvas
-        x = args.get("x", 150.0)
-        y = args.get("y", 105.0)
-
-        if state.with_gui and state.vpage:
-            # GUI mode: Drop shape from stencil
-            if block_type not in BLOCK_STENCILS:
-                available = ", ".join(BLOCK_STENCILS.keys())
-                return _result(f"Error: Unknown block type '{block_type}'. Available: {available}")
-
-            stencil_name, master_name = BLOCK_STENCILS[block_type]
-            if stencil_name not in state.stencils:
-                return _result(f"Error: Stencil '{stencil_name}' not loaded.")
-
-            # Convert mm to inches for Visio
-            x_inches = x / 25.4
-            y_inches = y / 25.4
-
-            master = state.stencils[stencil_name].Masters(master_name)
-            shape = state.vpage.Drop(master, x_inches, y_inches)
-
-            # ProMax auto-generates block name, but we track the shape
-            block_name = shape.Name
-            state.block_shapes[block_name] = shape
-
-            # Also track by user-provided name for connection convenience
-            if name:
-                state.block_shapes[name] = shape
-
-            logger.info(f"Created {block_type} block '{block_name}' at ({x}, {y}) mm")
-            return _result(f"Created {block_type} block '{block_name}' at ({x}, {y}) mm")
-        else:
-            # Background mode: Create block via COM API
-            if block_type not in BLOCK_TYPES:
-                available = ", ".join(BLOCK_TYPES.keys())
-                return _result(f"Error: Unknown block type '{block_type}'. Available: {available}")
-
-            type_id = BLOCK_TYPES[block_type]
-            block = state.flowsheet.Blocks.Add(type_id, name)
-            logger.info(f"Created {block_type} block '{name}' (data only)")
-            return _result(f"Created {block_type} block '{name}' (data only)")
+        return _result(_create_block(state, args))
 
+    except _ToolError as e:
+        return _result(str(e))
     except Exception as e:
-        logger.error(f"Failed to create block: {e}")
+        logger.error("Failed to create block: %s", e)
         return _result(f"Error: Failed to create block: {str(e)}")
 
 
-@tool(
+def _spec_list(value: Any, label: str) -> List[dict]:
+    """
+    Get a bulk tool's list of spec objects.
+
+    The agent sometimes sends the list as a JSON string; parse it, then
+    check that every entry is an object before any COM work starts.
+    """
+    if isinstance(value, str):
+        value = _json_loads(value)
+    if not isinstance(value, list) or not all(isinstance(spec, dict) for spec in value):
+        raise _ToolError(f"Error: {label} must be a list of objects")
+    return value
+
+
+@_sync_tool(
+    "create_blocks_bulk",
+    "Create several blocks in one call. blocks is a list of {block_type, name, x, y} objects (positions in mm).",
+    {"blocks": list}
+)
+def create_blocks_bulk_tool(args: dict) -> dict:
+    """Create several unit operation blocks in one Visio batch."""
+    state = get_promax_state()
+
+    if not state.has_flowsheet:
+        return _result("Error: No flowsheet. Create a project first.")
+
+    try:
+        blocks = _spec_list(args.get("blocks", []), "blocks")
+    except _ToolError as e:
+        return _result(str(e))
+    except Exception as e:
+        return _result(f"Error: Failed to parse blocks: {str(e)}")
+
+    if state.with_gui and state.vpage:
+        with _visio_batch(state, "Create blocks"):
+            created, lines = _drop_blocks(state, blocks)
+    else:
+        lines = []
+        created = 0
+        for spec in blocks:
+            try:
+                lines.append(_create_block(state, spec))
+                created += 1
+            except _ToolError as e:
+                lines.append(str(e))
+            except Exception as e:
+                logger.error("Failed to create block: %s", e)
+                lines.append(f"Error: Failed to create block '{spec.get('name')}': {str(e)}")
+
+    lines.insert(0, f"Created {created}/{len(blocks)} blocks")
+    return _result("\n".join(lines))
+
+
+def _drop_blocks(state: ProMaxState, blocks: List[dict]) -> Tuple[int, List[str]]:
+    """
+    Drop several block shapes with one Page.DropMany call.
+
+    Specs are validated first; invalid ones get an error line and are left
+    out of the drop. Returns the number created and one line per spec.
+    """
+    lines: List[Optional[str]] = [None] * len(blocks)
+    masters = []
+    xy = []
+    pending = []
+
+    for i, spec in enumerate(blocks):
+        x = spec.get("x", 150.0)
+        y = spec.get("y", 105.0)
+        try:
+            block_type = _block_type_arg(spec)
+            master = _block_master(state, block_type)
+            position = (float(x) * _MM_TO_IN, float(y) * _MM_TO_IN)
+        except _ToolError as e:
+            lines[i] = str(e)
+            continue
+        except (AttributeError, TypeError, ValueError) as e:
+            lines[i] = f"Error: Failed to create block '{spec.get('name')}': {str(e)}"
+            continue
+        masters.append(master)
+        xy.extend(position)
+        pending.append((i, block_type, spec.get("name"), x, y))
+
+    created = 0
+    if pending:
+        try:
+            _, shape_ids = state.vpage.DropMany(tuple(masters), tuple(xy))
+        except Exception as e:
+            logger.error("Failed to create blocks: %s", e)
+            for i, *_ in pending:
+                lines[i] = f"Error: Failed to create block '{blocks[i].get('name')}': {str(e)}"
+        else:
+            shapes = state.vpage.Shapes
+            for (i, block_type, name, x, y), shape_id in zip(pending, shape_ids):
+                block_name = _register_block_shape(state, shapes.ItemFromID(shape_id), name)
+                lines[i] = f"Created {block_type} block '{block_name}' at ({x}, {y}) mm"
+                created += 1
+            logger.info("Dropped %s blocks in one DropMany call", created)
+
+    return created, lines
+
+
+def _connect_stream(state: ProMaxState, args: dict) -> str:
+    """Glue a stream end to a block connection point; returns the result message."""
+    if not state.with_gui:
+        raise _ToolError("Error: Stream connections require GUI mode (with_gui=true)")
+
+    stream_name = args.get("stream_name")
+    block_name = args.get("block_name")
+    connection_point = args.get("connection_point", 1)
+    is_inlet = args.get("is_inlet", True)
+
+    # Get stream shape
+    if stream_name not in state.stream_shapes:
+        raise _ToolError(f"Error: Stream '{stream_name}' not found. Create it first.")
+    stream_shape = state.stream_shapes[stream_name]
+
+    # Get block shape
+    if block_name not in state.block_shapes:
+        raise _ToolError(f"Error: Block '{block_name}' not found. Create it first.")
+    block_shape = state.block_shapes[block_name]
+
+    # Connect using Visio GlueTo method
+    # Inlet streams: Glue stream END to block connection point
+    # Outlet streams: Glue stream BEGIN from block connection point
+    if 1 <= connection_point <= len(CONNECTION_CELLS):
+        connection_cell = CONNECTION_CELLS[connection_point - 1]
+    else:
+        connection_cell = f"Connections.X{connection_point}"
+    target = state.get_cell(block_shape, connection_cell)
+
+    if is_inlet:
+        state.get_cell(stream_shape, "EndX").GlueTo(target)
+        direction = "inlet"
+    else:
+        state.get_cell(stream_shape, "BeginX").GlueTo(target)
+        direction = "outlet"
+
+    logger.info("Connected stream '%s' to block '%s' point %s as %s", stream_name, block_name, connection_point, direction)
+    return f"Connected '{stream_name}' to '{block_name}' (point {connection_point}, {direction})"
+
+
+@_sync_tool(
     "connect_stream",
     "Connect a stream to a block inlet or outlet. Connection points: 1=left/feed, 2=top/vapor, 3=bottom/liquid, etc.",
     {"stream_name": str, "block_name": str, "connection_point": int, "is_inlet": bool}
 )
-async def connect_stream_tool(args: dict) -> dict:
+def connect_stream_tool(args: dict) -> dict:
     """Connect a stream to a block using Visio GlueTo."""
     state = get_promax_state()
 
+    if not state.has_flowsheet:
+        return _result("Error: No flowsheet. Create a project first.")
+
+    try:
+        return _result(_connect_stream(state, args))
+
+    except _ToolError as e:
+        return _result(str(e))
+    except Exception as e:
+        logger.error("Failed to connect stream: %s", e)
+        return _result(f"Error: Failed to connect stream: {str(e)}")
+
+
+@_sync_tool(
+    "connect_streams_bulk",
+    "Connect several streams to blocks in one call. connections is a list of {stream_name, block_name, connection_point, is_inlet} objects.",
+    {"connections": list}
+)
+def connect_streams_bulk_tool(args: dict) -> dict:
+    """Connect several streams to blocks in one Visio batch."""
+    state = get_promax_state()
+
     if not state.has_flowsheet:
         return _result("Error: No flowsheet. Create a project first.")
 
@@ -700,47 +1502,129 @@ async def connect_stream_tool(args: dict) -> dict:
         return _result("Error: Stream connections require GUI mode (with_gui=true)")
 
     try:
-        stream_name = args.get("stream_name")
-        block_name = args.get("block_name")
-        connection_point = args.get("connection_point", 1)
-        is_inlet = args.get("is_inlet", True)
-
-        # Get stream shape
-        if stream_name not in state.stream_shapes:
-            return _result(f"Error: Stream '{stream_name}' not found. Create it first.")
-        stream_shape = state.stream_shapes[stream_name]
-
-        # Get block shape
-        if block_name not in state.block_shapes:
-            return _result(f"Error: Block '{block_name}' not found. Create it first.")
-        block_shape = state.block_shapes[block_name]
-
-        # Connect using Visio GlueTo method
-        # Inlet streams: Glue stream END to block connection point
-        # Outlet streams: Glue stream BEGIN from block connection point
-        connection_cell = f"Connections.X{connection_point}"
+        connections = _spec_list(args.get("connections", []), "connections")
+    except _ToolError as e:
+        return _result(str(e))
+    except Exception as e:
+        return _result(f"Error: Failed to parse connections: {str(e)}")
+
+    lines = []
+    connected = 0
+    with _visio_batch(state, "Connect streams"):
+        for spec in connections:
+            try:
+                lines.append(_connect_stream(state, spec))
+                connected += 1
+            except _ToolError as e:
+                lines.append(str(e))
+            except Exception as e:
+                logger.error("Failed to connect stream: %s", e)
+                lines.append(f"Error: Failed to connect stream '{spec.get('stream_name')}': {str(e)}")
+
+    lines.insert(0, f"Connected {connected}/{len(connections)} streams")
+    return _result("\n".join(lines))
+
+
+# Operations accepted by batch_build, mapped to their tool helpers
+BATCH_OPS = {
+    "create_stream": _create_stream,
+    "create_block": _create_block,
+    "connect_stream": _connect_stream,
+    "set_stream_properties": _set_stream_properties,
+    "set_stream_composition": _set_stream_composition,
+    "flash_stream": _flash_stream,
+}
 
-        if is_inlet:
-            stream_shape.Cells("EndX").GlueTo(block_shape.Cells(connection_cell))
-            direction = "inlet"
-        else:
-            stream_shape.Cells("BeginX").GlueTo(block_shape.Cells(connection_cell))
-            direction = "outlet"
 
-        logger.info(f"Connected stream '{stream_name}' to block '{block_name}' point {connection_point} as {direction}")
-        return _result(f"Connected '{stream_name}' to '{block_name}' (point {connection_point}, {direction})")
+def _batch_refs(op_args: dict) -> List[str]:
+    """Get the op ids referenced by {"$ref": id} values in an op's args."""
+    return [
+        str(value["$ref"]) for value in op_args.values()
+        if isinstance(value, dict) and "$ref" in value
+    ]
 
+
+@_sync_tool(
+    "batch_build",
+    "Run several flowsheet-building operations in one call. ops is a list of {id, tool, args} objects; "
+    f"tool is one of: {', '.join(BATCH_OPS)}. Ops run in the given order. An args value of "
+    "{\"$ref\": \"<id>\"} is replaced by the name of the stream or block created by that earlier op.",
+    {"ops": list}
+)
+def batch_build_tool(args: dict) -> dict:
+    """Run a batch of build operations in order."""
+    state = get_promax_state()
+
+    if not state.has_flowsheet:
+        return _result("Error: No flowsheet. Create a project first.")
+
+    try:
+        ops = _spec_list(args.get("ops", []), "ops")
+    except _ToolError as e:
+        return _result(str(e))
     except Exception as e:
-        logger.error(f"Failed to connect stream: {e}")
-        return _result(f"Error: Failed to connect stream: {str(e)}")
+        return _result(f"Error: Failed to parse ops: {str(e)}")
+
+    by_id = {}
+    refs = {}
+    for index, op in enumerate(ops):
+        # Ops without an id use their index, which an explicit id may collide with
+        op_id = str(op.get("id", index))
+        if op_id in by_id:
+            return _result(f"Error: Duplicate batch op id '{op_id}'")
+        if not isinstance(op.get("args", {}), dict):
+            return _result(f"Error: Op '{op_id}' args must be an object")
+        # Ops keep their given order, so a reference must name an earlier op
+        deps = set(_batch_refs(op.get("args", {})))
+        unknown = deps - by_id.keys()
+        if unknown:
+            return _result(
+                f"Error: Op '{op_id}' references unknown or later op(s): {', '.join(sorted(unknown))}"
+            )
+        by_id[op_id] = op
+        refs[op_id] = deps
+
+    names: Dict[str, Any] = {}
+    failed = set()
+    lines = []
+    done = 0
+    with _visio_batch(state, "Batch build"):
+        for op_id, op in by_id.items():
+            if refs[op_id] & failed:
+                failed.add(op_id)
+                lines.append(f"[{op_id}] Skipped: depends on a failed op")
+                continue
+
+            func = BATCH_OPS.get(op.get("tool"))
+            try:
+                if func is None:
+                    raise _ToolError(f"Error: Unknown batch tool '{op.get('tool')}'")
+                op_args = {
+                    key: names[str(value["$ref"])]
+                    if isinstance(value, dict) and "$ref" in value else value
+                    for key, value in op.get("args", {}).items()
+                }
+                lines.append(f"[{op_id}] {func(state, op_args)}")
+                names[op_id] = op_args.get("name") or op_args.get("stream_name")
+                done += 1
+            except _ToolError as e:
+                failed.add(op_id)
+                lines.append(f"[{op_id}] {e}")
+            except Exception as e:
+                failed.add(op_id)
+                logger.error("Batch op '%s' failed: %s", op_id, e)
+                lines.append(f"[{op_id}] Error: Failed to {op.get('tool')}: {str(e)}")
+
+    lines.insert(0, f"Completed {done}/{len(by_id)} operations")
+    return _result("\n".join(lines))
 
 
-@tool(
+@_sync_tool(
     "list_streams",
     "List all process streams in the current flowsheet",
     {}
 )
-async def list_streams_tool(args: dict) -> dict:
+def list_streams_tool(args: dict) -> dict:
     """List all streams in the flowsheet."""
     state = get_promax_state()
 
@@ -748,25 +1632,22 @@ async def list_streams_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        streams = []
-        for i in range(state.flowsheet.PStreams.Count):
-            stream = state.flowsheet.PStreams(i)
-            streams.append(stream.Name)
+        streams = [stream.Name for stream in _iter_collection(state.pstreams)]
 
-        logger.info(f"Listed {len(streams)} streams")
+        logger.info("Listed %s streams", len(streams))
         return _result(f"Streams ({len(streams)}): {', '.join(streams)}" if streams else "No streams in flowsheet")
 
     except Exception as e:
-        logger.error(f"Failed to list streams: {e}")
+        logger.error("Failed to list streams: %s", e)
         return _result(f"Error: Failed to list streams: {str(e)}")
 
 
-@tool(
+@_sync_tool(
     "list_blocks",
     "List all blocks (unit operations) in the current flowsheet",
     {}
 )
-async def list_blocks_tool(args: dict) -> dict:
+def list_blocks_tool(args: dict) -> dict:
     """List all blocks in the flowsheet."""
     state = get_promax_state()
 
@@ -774,19 +1655,39 @@ async def list_blocks_tool(args: dict) -> dict:
         return _result("Error: No flowsheet. Create a project first.")
 
     try:
-        blocks = []
-        for i in range(state.flowsheet.Blocks.Count):
-            block = state.flowsheet.Blocks(i)
-            blocks.append(f"{block.Name} ({block.Type})")
+        blocks = [
+            f"{block.Name} ({block.Type})"
+            for block in _iter_collection(state.flowsheet.Blocks)
+        ]
 
-        logger.info(f"Listed {len(blocks)} blocks")
+        logger.info("Listed %s blocks", len(blocks))
         return _result(f"Blocks ({len(blocks)}): {', '.join(blocks)}" if blocks else "No blocks in flowsheet")
 
     except Exception as e:
-        logger.error(f"Failed to list blocks: {e}")
+        logger.error("Failed to list blocks: %s", e)
         return _result(f"Error: Failed to list blocks: {str(e)}")
 
 
+# ============================================================================
+# Session Cleanup
+# ============================================================================
+
+def _close_session(args: dict) -> dict:
+    """Close the open project and clear state (runs on the COM thread)."""
+    state = get_promax_state()
+    try:
+        if state.project:
+            state.project.Close()
+    finally:
+        state.reset()
+    return {}
+
+
+async def close_promax_session() -> None:
+    """Close the ProMax project on the COM thread that owns its proxies."""
+    await _run_com(_close_session, {})
+
+
 # ============================================================================
 # MCP Server Creation
 # ============================================================================
@@ -801,8 +1702,12 @@ def create_promax_mcp_server():
             open_project_tool,
             add_components_tool,
             create_stream_tool,
+            create_configured_stream_tool,
             create_block_tool,
+            create_blocks_bulk_tool,
             connect_stream_tool,
+            connect_streams_bulk_tool,
+            batch_build_tool,
             set_stream_properties_tool,
             set_stream_composition_tool,
             flash_stream_tool,
@@ -823,8 +1728,12 @@ ALLOWED_TOOLS = [
     "mcp__promax__open_project",
     "mcp__promax__add_components",
     "mcp__promax__create_stream",
+    "mcp__promax__create_configured_stream",
     "mcp__promax__create_block",
+    "mcp__promax__create_blocks_bulk",
     "mcp__promax__connect_stream",
+    "mcp__promax__connect_streams_bulk",
+    "mcp__promax__batch_build",
     "mcp__promax__set_stream_properties",
     "mcp__promax__set_stream_composition",
     "mcp__promax__flash_stream",
@@ -8,8 +8,11 @@ Provides MCP server for ProMax COM API operations including stream manipulation
 (temperature, pressure, composition) and flowsheet management.
 """
 
+import math
 import platform
 import sys
+from array import array
+from collections import OrderedDict
 
 # Platform check - this module requires Windows
 if platform.system() != "Windows":
@@ -20,39 +23,36 @@ if platform.system() != "Windows":
     )
     sys.exit(0)
 
-from typing import Annotated, Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 
+import win32com.client
 from fastmcp import FastMCP
 from fastmcp.client import Client
 from pydantic import Field
+from win32com.client import gencache
 
 from ufo.client.mcp.mcp_registry import MCPRegistry
 
 
-# Unit conversion constants
-UNIT_CONVERSIONS = {
-    "temperature": {
-        "K": lambda x: x,  # Base unit
-        "C": lambda x: x + 273.15,
-        "F": lambda x: (x - 32) * 5 / 9 + 273.15,
-        "R": lambda x: x * 5 / 9,
-    },
-    "pressure": {
-        "Pa": lambda x: x,  # Base unit
-        "kPa": lambda x: x * 1000,
-        "bar": lambda x: x * 100000,
-        "atm": lambda x: x * 101325,
-        "psi": lambda x: x * 6894.76,
-        "kg/cm2": lambda x: x * 98066.5,
-        "kg/cm2(g)": lambda x: x * 98066.5 + 101325,  # Gauge to absolute
-    },
-    "flow": {
-        "mol/s": lambda x: x,  # Base unit
-        "kmol/hr": lambda x: x * 1000 / 3600,
-        "kg/s": lambda x: x,
-        "kg/hr": lambda x: x / 3600,
-    },
+# Unit conversion constants: (unit_type, unit) -> (scale, offset), SI = x * scale + offset
+UNIT_FACTORS: Dict[Tuple[str, str], Tuple[float, float]] = {
+    ("temperature", "K"): (1.0, 0.0),  # Base unit
+    ("temperature", "C"): (1.0, 273.15),
+    ("temperature", "F"): (5 / 9, 273.15 - 32 * 5 / 9),
+    ("temperature", "R"): (5 / 9, 0.0),
+    ("pressure", "Pa"): (1.0, 0.0),  # Base unit
+    ("pressure", "kPa"): (1000.0, 0.0),
+    ("pressure", "bar"): (100000.0, 0.0),
+    ("pressure", "atm"): (101325.0, 0.0),
+    ("pressure", "psi"): (6894.76, 0.0),
+    ("pressure", "kg/cm2"): (98066.5, 0.0),
+    ("pressure", "kg/cm2(g)"): (98066.5, 101325.0),  # Gauge to absolute
+    ("flow", "mol/s"): (1.0, 0.0),  # Base unit
+    ("flow", "kmol/hr"): (1000 / 3600, 0.0),
+    ("flow", "kg/s"): (1.0, 0.0),
+    ("flow", "kg/hr"): (1 / 3600, 0.0),
 }
+_UNIT_TYPES = frozenset(unit_type for unit_type, _ in UNIT_FACTORS)
 
 
 # Phase property indices (pmxPhasePropEnum)
@@ -63,37 +63,96 @@ PHASE_PROPS = {
     "mass_flow": 17,  # kg/s
 }
 
+# Property indices bound once for the stream tools
+_P_TEMP = PHASE_PROPS["temperature"]
+_P_PRES = PHASE_PROPS["pressure"]
+_P_MOLAR = PHASE_PROPS["molar_flow"]
+_P_MASS = PHASE_PROPS["mass_flow"]
+
 # Phase constants
 PMX_TOTAL_PHASE = 5
 PMX_MOLAR_FRAC_BASIS = 6
 PMX_MASS_FLOW_BASIS = 1
 
+# Reported stream properties:
+# (property index, SI key, display key, display = SI * scale + offset)
+STREAM_OUTPUTS = (
+    (_P_TEMP, "temperature_K", "temperature_C", 1.0, -273.15),
+    (_P_PRES, "pressure_Pa", "pressure_kPa", 1 / 1000, 0.0),
+    (_P_MOLAR, "molar_flow_mol_s", "molar_flow_kmol_hr", 3600 / 1000, 0.0),
+    (_P_MASS, "mass_flow_kg_s", "mass_flow_kg_hr", 3600.0, 0.0),
+)
+
+# Auto-placement positions (inches): rows of five, 2" apart, left to right then down
+STREAM_GRID = tuple((2.0 + 2.0 * (i % 5), 5.0 - 2.0 * (i // 5)) for i in range(100))
+
+# Upper bound on cached stream/phase proxy pairs
+STREAM_CACHE_SIZE = 128
+
+
+def _iter_collection(collection: Any):
+    """
+    Iterate a ProMax COM collection.
+
+    Uses the collection's _NewEnum enumerator when it exposes one, otherwise
+    falls back to zero-based indexing up to Count.
+    """
+    try:
+        return iter(collection)
+    except TypeError:
+        return (collection(i) for i in range(collection.Count))
+
+
+def _component_names(components: Any) -> List[str]:
+    """Get environment component names in order."""
+    names = []
+    for i, comp in enumerate(_iter_collection(components)):
+        try:
+            names.append(comp.Species.SpeciesName.Name)
+        except Exception:
+            names.append(f"Component_{i}")
+    return names
+
 
 class ProMaxServerState:
-    """Singleton state for ProMax COM session management."""
+    """
+    State for the ProMax COM session.
 
-    _instance = None
-    _initialized = False
+    A single instance lives at module level (_STATE) and is shared by every
+    tool; slots keep its attributes off a per-instance dict.
+    """
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ProMaxServerState, cls).__new__(cls)
-        return cls._instance
+    __slots__ = (
+        "pmx", "project", "flowsheet", "visio", "vpage",
+        "stencils", "stream_shapes", "stream_positions",
+        "stream_counter", "with_gui",
+        "_stream_cache", "_prop_cache", "_env_names", "_env_index",
+        "_solver", "_solver_has_detail", "_env",
+    )
 
     def __init__(self):
-        if not self._initialized:
-            self.pmx = None  # ProMax COM object
-            self.project = None  # Current project
-            self.flowsheet = None  # Current flowsheet
-            self.visio = None  # Visio application (if with_gui)
-            self.vpage = None  # Visio page (if with_gui)
-            self.stencils = {}  # Loaded stencils
-            self.stream_shapes = {}  # Track stream Visio shapes {name: shape}
-            self.stream_positions = {}  # Track stream positions {name: (x, y)}
-            self.next_stream_x = 2.0  # Next x position for auto-placement
-            self.next_stream_y = 5.0  # Next y position for auto-placement
-            self.with_gui = False
-            ProMaxServerState._initialized = True
+        self.pmx = None  # ProMax COM object
+        self.project = None  # Current project
+        self.flowsheet = None  # Current flowsheet
+        self.visio = None  # Visio application (if with_gui)
+        self.vpage = None  # Visio page (if with_gui)
+        self.stencils = {}  # Loaded stencils
+        self.stream_shapes = {}  # Track stream Visio shapes {name: shape}
+        self.stream_positions = {}  # Track stream positions {name: (x, y)}
+        self.stream_counter = 0  # Next STREAM_GRID slot for auto-placement
+        self.with_gui = False
+        # {name: (stream, total phase)} COM proxies, least recently used first
+        self._stream_cache: "OrderedDict[str, Tuple[Any, Any]]" = OrderedDict()
+        # {(stream name, property index): total phase property proxy}
+        self._prop_cache: Dict[Tuple[str, int], Any] = {}
+        # Flowsheet Environment, its component names in order and
+        # lower-cased name -> index (kept current by add_component*)
+        self._env = None
+        self._env_names: Optional[List[str]] = None
+        self._env_index: Optional[Dict[str, int]] = None
+        # Flowsheet Solver and whether it has DetailStatus (None = not probed yet)
+        self._solver = None
+        self._solver_has_detail: Optional[bool] = None
 
     def reset(self):
         """Reset the state for a new session."""
@@ -105,18 +164,167 @@ class ProMaxServerState:
         self.stencils = {}
         self.stream_shapes = {}
         self.stream_positions = {}
-        self.next_stream_x = 2.0
-        self.next_stream_y = 5.0
+        self.stream_counter = 0
         self.with_gui = False
+        self.clear_flowsheet_cache()
+
+    def clear_flowsheet_cache(self):
+        """Drop everything cached for the current flowsheet (call whenever it changes)."""
+        self._stream_cache.clear()
+        self._prop_cache.clear()
+        self._solver = None
+        self._solver_has_detail = None
+        self._env = None
+        self.invalidate_env_components()
+
+    def get_solver(self) -> Any:
+        """Get the flowsheet's Solver, resolving it through COM only once."""
+        if self._solver is None:
+            self._solver = self.flowsheet.Solver
+        return self._solver
+
+    def solver_has_detail(self) -> bool:
+        """Whether the Solver exposes DetailStatus, probed through COM only once."""
+        if self._solver_has_detail is None:
+            self._solver_has_detail = hasattr(self.get_solver(), "DetailStatus")
+        return self._solver_has_detail
+
+    def invalidate_env_components(self):
+        """Force the environment component names to be re-read."""
+        self._env_names = None
+        self._env_index = None
+
+    def get_environment(self) -> Any:
+        """Get the flowsheet's Environment, resolving it through COM only once."""
+        if self._env is None:
+            self._env = self.flowsheet.Environment
+        return self._env
+
+    def get_env_component_names(self) -> List[str]:
+        """Get environment component names in order, reading them only once."""
+        if self._env_names is None:
+            self._set_env_components(_component_names(self.get_environment().Components))
+        return self._env_names
+
+    def get_env_component_index(self) -> Dict[str, int]:
+        """Get a lower-cased component name -> environment index map, reading names only once."""
+        self.get_env_component_names()
+        return self._env_index
+
+    def extend_env_components(self, names: List[str]):
+        """Append newly added components to the cached names (Components.Add appends)."""
+        if self._env_names is not None:
+            self._set_env_components(self._env_names + list(names))
+
+    def _set_env_components(self, names: List[str]):
+        self._env_names = names
+        self._env_index = {name.lower(): i for i, name in enumerate(names)}
+
+    def forget_stream(self, stream_name: str):
+        """Drop cached proxies for one stream."""
+        self._stream_cache.pop(stream_name, None)
+        for key in [key for key in self._prop_cache if key[0] == stream_name]:
+            del self._prop_cache[key]
+
+    def get_stream_and_total_phase(self, stream_name: str) -> Tuple[Any, Any]:
+        """Get a stream and its total phase, resolving them through COM only once."""
+        cache = self._stream_cache
+        entry = cache.get(stream_name)
+        if entry is not None:
+            cache.move_to_end(stream_name)
+            return entry
+        stream = self.flowsheet.PStreams(stream_name)
+        entry = (stream, stream.Phases(PMX_TOTAL_PHASE))
+        cache[stream_name] = entry
+        if len(cache) > STREAM_CACHE_SIZE:
+            self.forget_stream(next(iter(cache)))
+        return entry
+
+    def get_total_phase_property(self, stream_name: str, prop_index: int) -> Any:
+        """Get a total phase property proxy, resolving it through COM only once."""
+        key = (stream_name, prop_index)
+        prop = self._prop_cache.get(key)
+        if prop is None:
+            _, phase = self.get_stream_and_total_phase(stream_name)
+            prop = phase.Properties(prop_index)
+            self._prop_cache[key] = prop
+        return prop
 
 
 def convert_units(value: float, unit: str, unit_type: str) -> float:
     """Convert value to SI units."""
-    if unit_type not in UNIT_CONVERSIONS:
-        raise ValueError(f"Unknown unit type: {unit_type}")
-    if unit not in UNIT_CONVERSIONS[unit_type]:
-        raise ValueError(f"Unknown {unit_type} unit: {unit}")
-    return UNIT_CONVERSIONS[unit_type][unit](value)
+    try:
+        scale, offset = UNIT_FACTORS[(unit_type, unit)]
+    except KeyError:
+        if unit_type not in _UNIT_TYPES:
+            raise ValueError(f"Unknown unit type: {unit_type}") from None
+        raise ValueError(f"Unknown {unit_type} unit: {unit}") from None
+    return value * scale + offset
+
+
+def read_stream_properties(state: ProMaxServerState, stream_name: str) -> Dict[str, Any]:
+    """Read a stream's total phase properties in SI and display units."""
+    result = {"stream_name": stream_name}
+    for prop_index, si_key, display_key, scale, offset in STREAM_OUTPUTS:
+        value = state.get_total_phase_property(stream_name, prop_index).Value
+        result[si_key] = value
+        result[display_key] = value * scale + offset if value else None
+    return result
+
+
+def write_stream_composition(
+    state: ProMaxServerState,
+    stream_name: str,
+    composition: Dict[str, float],
+    env_index: Dict[str, int],
+    n_comps: int,
+) -> str:
+    """Normalize component mass flows and write them as the stream's fractions."""
+    # Get total mass flow (fsum: exact, order-independent)
+    total_mass = math.fsum(composition.values())
+    if total_mass <= 0:
+        return f"Error: Total mass flow must be positive, got {total_mass}"
+
+    # Build composition array matching environment order
+    comp_values = array("d", bytes(8 * n_comps))
+    matched = []
+    unmatched = []
+
+    for our_name, mass in composition.items():
+        i = env_index.get(our_name.lower())
+        if i is None:
+            unmatched.append(our_name)
+        else:
+            mass_frac = mass / total_mass
+            comp_values[i] = mass_frac
+            matched.append(f"{our_name}: {mass_frac*100:.2f}%")
+
+    # Set composition using molar fraction basis (SIValues must be a tuple)
+    _, phase = state.get_stream_and_total_phase(stream_name)
+    comp_obj = phase.Composition(PMX_MOLAR_FRAC_BASIS)
+    comp_obj.SIValues = tuple(comp_values)
+
+    result = f"Set {stream_name} composition ({len(matched)} components)"
+    if unmatched:
+        result += f"\nWarning: Unmatched components: {', '.join(unmatched)}"
+
+    return result
+
+
+def _dispatch(prog_id: str) -> Any:
+    """
+    Create a ProMax COM object, early-bound.
+
+    EnsureDispatch runs makepy when no wrapper module exists yet. Once it has
+    been generated, plain Dispatch picks it up from the gencache, so the
+    typelib is only processed on the first connect of an install.
+    """
+    if gencache.GetModuleForProgID(prog_id) is not None:
+        return win32com.client.Dispatch(prog_id)
+    return gencache.EnsureDispatch(prog_id)
+
+
+_STATE = ProMaxServerState()
 
 
 @MCPRegistry.register_factory_decorator("ProMaxCOMExecutor")
@@ -126,7 +334,7 @@ def create_promax_mcp_server(process_name: str) -> FastMCP:
     :param process_name: Name of the ProMax process.
     :return: FastMCP instance for ProMax operations.
     """
-    state = ProMaxServerState()
+    state = _STATE
 
     mcp = FastMCP(
         "UFO ProMax MCP Server",
@@ -164,18 +372,17 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
         Use with_gui=True to see visual Visio diagrams, with_gui=False for faster background processing.
         """
         try:
-            import win32com.client
-            from win32com.client import gencache
-
             if with_gui:
-                state.pmx = gencache.EnsureDispatch("ProMax.ProMaxOutOfProc")
+                state.pmx = _dispatch("ProMax.ProMaxOutOfProc")
                 state.with_gui = True
             else:
-                state.pmx = gencache.EnsureDispatch("ProMax.ProMax")
+                state.pmx = _dispatch("ProMax.ProMax")
                 state.with_gui = False
 
             version = f"{state.pmx.Version.Major}.{state.pmx.Version.Minor}"
             mode = "with GUI" if with_gui else "background"
+            if not type(state.pmx).__module__.startswith("win32com.gen_py"):
+                mode += ", late-bound"
             return f"Connected to ProMax {version} ({mode} mode)"
 
         except Exception as e:
@@ -199,6 +406,7 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
         try:
             state.project = state.pmx.New()
             state.flowsheet = state.project.Flowsheets.Add(flowsheet_name)
+            state.clear_flowsheet_cache()
 
             # Load stencils and get Visio page if using GUI mode
             if state.with_gui:
@@ -228,6 +436,7 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             state.project = state.pmx.Open(file_path)
             if state.project.Flowsheets.Count > 0:
                 state.flowsheet = state.project.Flowsheets(0)
+            state.clear_flowsheet_cache()
             return f"Opened project: {file_path}"
 
         except Exception as e:
@@ -249,8 +458,9 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            env = state.flowsheet.Environment
+            env = state.get_environment()
             env.Components.Add(component_name)
+            state.extend_env_components([component_name])
             return f"Added component: {component_name}"
 
         except Exception as e:
@@ -271,18 +481,36 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
         if not state.flowsheet:
             return "Error: No flowsheet. Create or open a project first."
 
-        env = state.flowsheet.Environment
+        env = state.get_environment()
         added = []
+        present = []
         failed = []
 
+        # Skip components already in the environment instead of letting Add
+        # raise across COM for each one (common when a batch is retried)
+        try:
+            existing = {name.lower() for name in state.get_env_component_names()}
+        except Exception as e:
+            return f"Failed to read environment components: {str(e)}"
+
         for comp_name in component_names:
+            key = comp_name.lower()
+            if key in existing:
+                present.append(comp_name)
+                continue
             try:
                 env.Components.Add(comp_name)
                 added.append(comp_name)
+                existing.add(key)
             except Exception as e:
                 failed.append(f"{comp_name}: {str(e)}")
 
+        if added:
+            state.extend_env_components(added)
+
         result = f"Added {len(added)} components: {', '.join(added)}"
+        if present:
+            result += f"\nAlready present: {', '.join(present)}"
         if failed:
             result += f"\nFailed: {'; '.join(failed)}"
         return result
@@ -309,9 +537,13 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
+            # A recreated stream must not reuse proxies of the one it replaces
+            state.forget_stream(stream_name)
+
             # Determine position
-            x = x_position if x_position is not None else state.next_stream_x
-            y = y_position if y_position is not None else state.next_stream_y
+            auto_x, auto_y = STREAM_GRID[state.stream_counter % len(STREAM_GRID)]
+            x = x_position if x_position is not None else auto_x
+            y = y_position if y_position is not None else auto_y
 
             if state.with_gui and state.vpage:
                 # GUI mode: Create stream with Visio shape
@@ -328,13 +560,9 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
                 state.stream_shapes[stream_name] = shape
                 state.stream_positions[stream_name] = (x, y)
 
-                # Update auto-position for next stream (move right)
+                # Advance auto-position to the next grid slot
                 if x_position is None:
-                    state.next_stream_x += 2.0
-                    # Wrap to new row if too far right
-                    if state.next_stream_x > 10.0:
-                        state.next_stream_x = 2.0
-                        state.next_stream_y -= 2.0
+                    state.stream_counter += 1
 
                 return f"Created stream with Visio shape: {stream_name} at ({x:.1f}, {y:.1f})"
             else:
@@ -361,12 +589,9 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
-            phase = stream.Phases(PMX_TOTAL_PHASE)
-
             # Convert to Kelvin
             temp_K = convert_units(value, units, "temperature")
-            phase.Properties(PHASE_PROPS["temperature"]).Value = temp_K
+            state.get_total_phase_property(stream_name, _P_TEMP).Value = temp_K
 
             return f"Set {stream_name} temperature to {value} {units} ({temp_K:.2f} K)"
 
@@ -391,12 +616,9 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
-            phase = stream.Phases(PMX_TOTAL_PHASE)
-
             # Convert to Pascals
             pres_Pa = convert_units(value, units, "pressure")
-            phase.Properties(PHASE_PROPS["pressure"]).Value = pres_Pa
+            state.get_total_phase_property(stream_name, _P_PRES).Value = pres_Pa
 
             return f"Set {stream_name} pressure to {value} {units} ({pres_Pa/1000:.2f} kPa)"
 
@@ -422,22 +644,83 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
-            phase = stream.Phases(PMX_TOTAL_PHASE)
-
             # Convert to SI units
             flow_si = convert_units(value, units, "flow")
 
             if flow_type.lower() == "molar":
-                phase.Properties(PHASE_PROPS["molar_flow"]).Value = flow_si
+                state.get_total_phase_property(stream_name, _P_MOLAR).Value = flow_si
                 return f"Set {stream_name} molar flow to {value} {units} ({flow_si:.4f} mol/s)"
             else:
-                phase.Properties(PHASE_PROPS["mass_flow"]).Value = flow_si
+                state.get_total_phase_property(stream_name, _P_MASS).Value = flow_si
                 return f"Set {stream_name} mass flow to {value} {units} ({flow_si:.4f} kg/s)"
 
         except Exception as e:
             return f"Failed to set flow: {str(e)}"
 
+    @mcp.tool(tags={"AppAgent"})
+    def configure_stream(
+        stream_name: Annotated[str, Field(description="Name of the stream to modify")],
+        temperature: Annotated[
+            Optional[float], Field(description="Temperature value. Left unchanged if not specified.")
+        ] = None,
+        temperature_units: Annotated[
+            str, Field(description="Temperature units: 'K', 'C', 'F', 'R'")
+        ] = "C",
+        pressure: Annotated[
+            Optional[float], Field(description="Pressure value. Left unchanged if not specified.")
+        ] = None,
+        pressure_units: Annotated[
+            str,
+            Field(description="Pressure units: 'Pa', 'kPa', 'bar', 'atm', 'psi', 'kg/cm2', 'kg/cm2(g)' (gauge)"),
+        ] = "kPa",
+        flow: Annotated[
+            Optional[float], Field(description="Flow rate value. Left unchanged if not specified.")
+        ] = None,
+        flow_type: Annotated[
+            str, Field(description="Flow type: 'molar' or 'mass'")
+        ] = "molar",
+        flow_units: Annotated[
+            str,
+            Field(description="Flow units: 'mol/s', 'kmol/hr' for molar; 'kg/s', 'kg/hr' for mass"),
+        ] = "kmol/hr",
+        flash: Annotated[
+            bool, Field(description="Run a flash calculation after setting the conditions")
+        ] = True,
+    ) -> Annotated[str, Field(description="Stream configuration status")]:
+        """
+        Set temperature, pressure and flow rate of a process stream in one call, then optionally flash it.
+        Prefer this over separate set_stream_temperature/pressure/flow and flash_stream calls.
+        """
+        if not state.flowsheet:
+            return "Error: No flowsheet. Create or open a project first."
+
+        try:
+            # Convert everything first so a bad unit leaves the stream untouched
+            writes = []
+            if temperature is not None:
+                temp_K = convert_units(temperature, temperature_units, "temperature")
+                writes.append((_P_TEMP, temp_K, f"T={temperature} {temperature_units}"))
+            if pressure is not None:
+                pres_Pa = convert_units(pressure, pressure_units, "pressure")
+                writes.append((_P_PRES, pres_Pa, f"P={pressure} {pressure_units}"))
+            if flow is not None:
+                flow_si = convert_units(flow, flow_units, "flow")
+                flow_prop = _P_MOLAR if flow_type.lower() == "molar" else _P_MASS
+                writes.append((flow_prop, flow_si, f"{flow_type} flow={flow} {flow_units}"))
+
+            for prop_index, value, _ in writes:
+                state.get_total_phase_property(stream_name, prop_index).Value = value
+
+            result = f"Configured {stream_name}: {', '.join(label for _, _, label in writes) or 'no changes'}"
+            if flash:
+                stream, _ = state.get_stream_and_total_phase(stream_name)
+                stream.Flash()
+                result += " (flashed)"
+            return result
+
+        except Exception as e:
+            return f"Failed to configure stream: {str(e)}"
+
     @mcp.tool(tags={"AppAgent"})
     def set_stream_composition(
         stream_name: Annotated[str, Field(description="Name of the stream to modify")],
@@ -456,59 +739,54 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
-            env = state.flowsheet.Environment
-            n_comps = env.Components.Count
+            # Component names and index are cached until components change
+            n_comps = len(state.get_env_component_names())
 
             if n_comps == 0:
                 return f"Error: No components in environment. Add components first."
 
-            # Get total mass flow
-            total_mass = sum(composition.values())
-
-            # Calculate mass fractions
-            mass_fractions = {k: v / total_mass for k, v in composition.items()}
-
-            # Get environment component names in order
-            env_comp_names = []
-            for i in range(n_comps):
-                try:
-                    comp = env.Components(i)
-                    pmx_name = comp.Species.SpeciesName.Name
-                    env_comp_names.append(pmx_name)
-                except:
-                    env_comp_names.append(f"Component_{i}")
-
-            # Build composition array matching environment order
-            comp_values = [0.0] * n_comps
-            matched = []
-            unmatched = []
-
-            for our_name, mass_frac in mass_fractions.items():
-                found = False
-                for i, pmx_name in enumerate(env_comp_names):
-                    if our_name.lower() == pmx_name.lower():
-                        comp_values[i] = mass_frac
-                        matched.append(f"{our_name}: {mass_frac*100:.2f}%")
-                        found = True
-                        break
-                if not found:
-                    unmatched.append(our_name)
-
-            # Set composition using molar fraction basis
-            phase = stream.Phases(PMX_TOTAL_PHASE)
-            comp_obj = phase.Composition(PMX_MOLAR_FRAC_BASIS)
-            comp_obj.SIValues = tuple(comp_values)
-
-            result = f"Set {stream_name} composition ({len(matched)} components)"
-            if unmatched:
-                result += f"\nWarning: Unmatched components: {', '.join(unmatched)}"
-
-            return result
+            env_index = state.get_env_component_index()
+            return write_stream_composition(state, stream_name, composition, env_index, n_comps)
 
         except Exception as e:
             return f"Failed to set composition: {str(e)}"
 
+    @mcp.tool(tags={"AppAgent"})
+    def set_streams_composition_batch(
+        compositions: Annotated[
+            Dict[str, Dict[str, float]],
+            Field(
+                description="Stream name -> {component name: mass flow in kg/hr} (e.g., {'Feed': {'Methane': 302, 'Water': 8}})"
+            ),
+        ],
+    ) -> Annotated[str, Field(description="Composition setting status per stream")]:
+        """
+        Set the compositions of several process streams in one call (mass flow basis, kg/hr).
+        The environment components are read once for all streams.
+        """
+        if not state.flowsheet:
+            return "Error: No flowsheet. Create or open a project first."
+
+        try:
+            # Component names and index are cached until components change
+            n_comps = len(state.get_env_component_names())
+
+            if n_comps == 0:
+                return f"Error: No components in environment. Add components first."
+
+            env_index = state.get_env_component_index()
+
+        except Exception as e:
+            return f"Failed to set compositions: {str(e)}"
+
+        lines = []
+        for stream_name, composition in compositions.items():
+            try:
+                lines.append(write_stream_composition(state, stream_name, composition, env_index, n_comps))
+            except Exception as e:
+                lines.append(f"Failed to set {stream_name} composition: {str(e)}")
+        return "\n".join(lines)
+
     @mcp.tool(tags={"AppAgent"})
     def flash_stream(
         stream_name: Annotated[str, Field(description="Name of the stream to flash")],
@@ -521,7 +799,7 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
+            stream, _ = state.get_stream_and_total_phase(stream_name)
             stream.Flash()
             return f"Flash calculation completed for {stream_name}"
 
@@ -539,29 +817,34 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return {"error": "No flowsheet. Create or open a project first."}
 
         try:
-            stream = state.flowsheet.PStreams(stream_name)
-            phase = stream.Phases(PMX_TOTAL_PHASE)
-
-            temp_K = phase.Properties(PHASE_PROPS["temperature"]).Value
-            pres_Pa = phase.Properties(PHASE_PROPS["pressure"]).Value
-            molar_flow = phase.Properties(PHASE_PROPS["molar_flow"]).Value
-            mass_flow = phase.Properties(PHASE_PROPS["mass_flow"]).Value
-
-            return {
-                "stream_name": stream_name,
-                "temperature_K": temp_K,
-                "temperature_C": temp_K - 273.15 if temp_K else None,
-                "pressure_Pa": pres_Pa,
-                "pressure_kPa": pres_Pa / 1000 if pres_Pa else None,
-                "molar_flow_mol_s": molar_flow,
-                "molar_flow_kmol_hr": molar_flow * 3600 / 1000 if molar_flow else None,
-                "mass_flow_kg_s": mass_flow,
-                "mass_flow_kg_hr": mass_flow * 3600 if mass_flow else None,
-            }
+            return read_stream_properties(state, stream_name)
 
         except Exception as e:
             return {"error": f"Failed to get properties: {str(e)}"}
 
+    @mcp.tool(tags={"AppAgent"})
+    def get_streams_properties_batch(
+        stream_names: Annotated[
+            List[str], Field(description="Names of the streams to query")
+        ],
+    ) -> Annotated[
+        Dict[str, Dict[str, Any]], Field(description="Stream properties keyed by stream name")
+    ]:
+        """
+        Get current properties of several process streams in one call.
+        A stream that cannot be read reports an error entry; the others are still returned.
+        """
+        if not state.flowsheet:
+            return {"error": {"error": "No flowsheet. Create or open a project first."}}
+
+        results = {}
+        for stream_name in stream_names:
+            try:
+                results[stream_name] = read_stream_properties(state, stream_name)
+            except Exception as e:
+                results[stream_name] = {"error": f"Failed to get properties: {str(e)}"}
+        return results
+
     @mcp.tool(tags={"AppAgent"})
     def list_streams(
     ) -> Annotated[List[str], Field(description="List of stream names in the flowsheet")]:
@@ -572,11 +855,7 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return ["Error: No flowsheet. Create or open a project first."]
 
         try:
-            streams = []
-            for i in range(state.flowsheet.PStreams.Count):
-                stream = state.flowsheet.PStreams(i)
-                streams.append(stream.Name)
-            return streams
+            return [stream.Name for stream in _iter_collection(state.flowsheet.PStreams)]
 
         except Exception as e:
             return [f"Error listing streams: {str(e)}"]
@@ -591,16 +870,8 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return ["Error: No flowsheet. Create or open a project first."]
 
         try:
-            env = state.flowsheet.Environment
-            components = []
-            for i in range(env.Components.Count):
-                comp = env.Components(i)
-                try:
-                    name = comp.Species.SpeciesName.Name
-                except:
-                    name = f"Component_{i}"
-                components.append(name)
-            return components
+            env = state.get_environment()
+            return _component_names(env.Components)
 
         except Exception as e:
             return [f"Error listing components: {str(e)}"]
@@ -615,14 +886,14 @@ Workflow: Always call connect_promax FIRST before any other ProMax operation."""
             return "Error: No flowsheet. Create or open a project first."
 
         try:
-            solver = state.flowsheet.Solver
+            solver = state.get_solver()
             solver.Solve()
 
             status = solver.LastSolverExecStatus
             if status >= 1:  # pmxConverged
                 return "Flowsheet solved successfully (converged)"
             else:
-                detail = solver.DetailStatus if hasattr(solver, "DetailStatus") else "Unknown"
+                detail = solver.DetailStatus if state.solver_has_detail() else "Unknown"
                 return f"Solver did not converge. Status: {status}, Detail: {detail}"
 
         except Exception as e:
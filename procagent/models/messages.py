@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ResponseType(str, Enum):
@@ -23,6 +23,8 @@ class ResponseType(str, Enum):
 class ChatMessage(BaseModel):
     """Message from client to server."""
 
+    model_config = ConfigDict(extra="ignore")
+
     message: str
     pfd_image: Optional[str] = Field(
         default=None,
@@ -38,6 +40,8 @@ class ChatMessage(BaseModel):
 class ToolUseInfo(BaseModel):
     """Information about a tool being used."""
 
+    model_config = ConfigDict(extra="ignore")
+
     tool_name: str
     tool_input: Dict[str, Any]
     tool_id: Optional[str] = None
@@ -46,13 +50,22 @@ class ToolUseInfo(BaseModel):
 class ResultsInfo(BaseModel):
     """Simulation results information."""
 
+    model_config = ConfigDict(extra="ignore")
+
     parameters: List[Dict[str, Any]]  # [{name, target, actual, unit, passed}]
     overall_pass: bool
     suggestions: Optional[List[Dict[str, str]]] = None
 
 
 class AgentResponse(BaseModel):
-    """Response from server to client."""
+    """
+    Response from server to client.
+
+    Built once per streamed agent event. Server code that already holds
+    typed values creates it with model_construct() to skip validation.
+    """
+
+    model_config = ConfigDict(extra="ignore")
 
     type: ResponseType
     content: Optional[str] = None
@@ -2,6 +2,7 @@
 ProMax-related data models.
 """
 
+import math
 from enum import Enum
 from typing import Dict, List, Optional
 
@@ -46,7 +47,7 @@ class ComponentComposition(BaseModel):
         """Validate that mole fractions sum to 1.0 (within tolerance)."""
         if not v:
             return v
-        total = sum(v.values())
+        total = math.fsum(v.values())
         if abs(total - 1.0) > 0.001:
             raise ValueError(
                 f"Composition mole fractions must sum to 1.0, got {total:.4f}"
@@ -5,12 +5,15 @@ Provides WebSocket chat endpoint and VNC proxy for browser-based interface.
 """
 
 import asyncio
+import functools
+import heapq
 import sys
 import json
+import os
 import uuid
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 # Windows needs ProactorEventLoop for subprocess support (Claude Agent SDK)
 if sys.platform == 'win32':
@@ -27,9 +30,15 @@ from fastapi.staticfiles import StaticFiles
 from ..config import get_settings
 from ..logging_config import setup_logging, get_logger
 from ..agent.core import ProcAgentCore
+from ..mcp.promax_server import shutdown_com_thread
 from ..models import ChatMessage, AgentResponse, ResponseType
 from .vnc_manager import get_websockify_manager
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
 # Initialize logging
 setup_logging()
 logger = get_logger("server.app")
@@ -40,8 +49,10 @@ async def lifespan(app: FastAPI):
     """
     Manage application lifecycle.
 
-    On startup: Start websockify for VNC WebSocket proxy (if configured).
-    On shutdown: Stop websockify subprocess.
+    On startup: Start websockify for VNC WebSocket proxy (if configured) and
+    the auth token sweeper.
+    On shutdown: Stop websockify subprocess, the sweeper and the ProMax COM
+    worker thread.
     """
     settings = get_settings()
     manager = get_websockify_manager()
@@ -57,13 +68,17 @@ async def lifespan(app: FastAPI):
             )
     else:
         logger.info("websockify auto-start disabled (vnc.auto_start_websockify=false)")
+    auth_sweeper = asyncio.create_task(_auth_sweep_loop())
 
     yield  # Server runs here
 
     # Shutdown
+    auth_sweeper.cancel()
     if manager.is_running():
         logger.info("Stopping websockify...")
         manager.stop()
+    # Joining the COM thread blocks while queued work drains
+    await asyncio.to_thread(shutdown_com_thread)
 
 
 # Create FastAPI app
@@ -86,9 +101,57 @@ app.add_middleware(
 # Session storage
 sessions: Dict[str, ProcAgentCore] = {}
 
-# Authentication session storage (token -> expiry timestamp)
+
+@functools.lru_cache(maxsize=None)
+def _working_base() -> Path:
+    """Get the absolute parent of the per-session working directories (resolved on first use)."""
+    return Path(get_settings().promax.working_dir).resolve()
+
+
+# Authentication session storage (token -> time.monotonic() expiry)
 auth_sessions: Dict[str, float] = {}
 
+# (expiry, token) min-heap used to sweep expired tokens out of auth_sessions
+_auth_expiry_heap: List[Tuple[float, str]] = []
+
+# Seconds between sweeps of expired auth tokens
+AUTH_SWEEP_INTERVAL = 60
+
+
+def _is_authenticated(session: Optional[str]) -> bool:
+    """Check a session cookie against auth_sessions, dropping it if expired."""
+    if not session:
+        return False
+    expiry = auth_sessions.get(session)
+    if expiry is None:
+        return False
+    if time.monotonic() < expiry:
+        return True
+    del auth_sessions[session]
+    return False
+
+
+def _sweep_auth_sessions() -> int:
+    """Remove expired tokens; returns how many were removed."""
+    now = time.monotonic()
+    removed = 0
+    while _auth_expiry_heap and _auth_expiry_heap[0][0] <= now:
+        expiry, token = heapq.heappop(_auth_expiry_heap)
+        # Skip heap entries for tokens already logged out
+        if auth_sessions.get(token) == expiry:
+            del auth_sessions[token]
+            removed += 1
+    return removed
+
+
+async def _auth_sweep_loop() -> None:
+    """Background task that periodically sweeps expired auth tokens."""
+    while True:
+        await asyncio.sleep(AUTH_SWEEP_INTERVAL)
+        removed = _sweep_auth_sessions()
+        if removed:
+            logger.info(f"Expired {removed} auth session(s)")
+
 
 # ============================================================================
 # Static file serving
@@ -100,17 +163,36 @@ if web_dir.exists():
     app.mount("/static", StaticFiles(directory=str(web_dir)), name="static")
 
 
+def _load_page(name: str) -> Optional[bytes]:
+    """Read an HTML page from web_dir, or None if it does not exist."""
+    path = web_dir / name
+    return path.read_bytes() if path.is_file() else None
+
+
+# The login and app pages are read once at import and served from memory.
+# Set PROCAGENT_RELOAD_PAGES=1 to re-read them on every request while editing.
+_RELOAD_PAGES = bool(os.getenv("PROCAGENT_RELOAD_PAGES"))
+_PAGES = {name: _load_page(name) for name in ("login.html", "index.html")}
+
+
+def _page(name: str) -> Optional[bytes]:
+    """Get a cached HTML page (see _RELOAD_PAGES)."""
+    if _RELOAD_PAGES:
+        return _load_page(name)
+    return _PAGES[name]
+
+
 @app.get("/", response_class=HTMLResponse)
 async def root(session: Optional[str] = Cookie(None)):
     """Serve login page or redirect to app if authenticated."""
     # Check if authenticated
-    if session and session in auth_sessions and time.time() < auth_sessions[session]:
+    if _is_authenticated(session):
         return RedirectResponse(url="/app", status_code=302)
 
     # Serve login page
-    login_path = web_dir / "login.html"
-    if login_path.exists():
-        return FileResponse(login_path)
+    login_page = _page("login.html")
+    if login_page is not None:
+        return HTMLResponse(content=login_page)
     return HTMLResponse(content="""
     <!DOCTYPE html>
     <html>
@@ -127,13 +209,13 @@ async def root(session: Optional[str] = Cookie(None)):
 async def app_page(session: Optional[str] = Cookie(None)):
     """Serve the main application (requires auth)."""
     # Check authentication
-    if not session or session not in auth_sessions or time.time() >= auth_sessions[session]:
+    if not _is_authenticated(session):
         return RedirectResponse(url="/", status_code=302)
 
     # Serve main app
-    index_path = web_dir / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+    index_page = _page("index.html")
+    if index_page is not None:
+        return HTMLResponse(content=index_page)
     return HTMLResponse(content="""
     <!DOCTYPE html>
     <html>
@@ -176,8 +258,9 @@ async def login(
     if username == settings.auth.username and password == settings.auth.password:
         # Create session token
         session_token = secrets.token_urlsafe(32)
-        expiry = time.time() + settings.auth.session_timeout
+        expiry = time.monotonic() + settings.auth.session_timeout
         auth_sessions[session_token] = expiry
+        heapq.heappush(_auth_expiry_heap, (expiry, session_token))
 
         # Set cookie
         response.set_cookie(
@@ -206,13 +289,7 @@ async def logout(response: Response, session: Optional[str] = Cookie(None)):
 @app.get("/api/auth/status")
 async def auth_status(session: Optional[str] = Cookie(None)):
     """Check if user is authenticated."""
-    if session and session in auth_sessions:
-        if time.time() < auth_sessions[session]:
-            return {"authenticated": True}
-        else:
-            # Session expired, clean up
-            del auth_sessions[session]
-    return {"authenticated": False}
+    return {"authenticated": _is_authenticated(session)}
 
 
 # ============================================================================
@@ -238,6 +315,56 @@ async def get_vnc_info(session_id: str):
 # WebSocket chat endpoint
 # ============================================================================
 
+# Outgoing frames already queued behind the first one are coalesced into a
+# single "batch" message of at most WS_BATCH_MAX items
+WS_BATCH_MAX = 32
+
+
+def _frame(data: dict) -> str:
+    """Serialize a plain dict frame, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _parse_frame(raw: Union[str, bytes]) -> dict:
+    """Parse an inbound text or binary frame, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+async def _ws_writer(websocket: WebSocket, queue: "asyncio.Queue[Optional[str]]") -> None:
+    """
+    Send queued, already-serialized frames until a None sentinel is received.
+
+    A frame that arrives alone is sent as-is and at once; frames that queued
+    up meanwhile (e.g. during the previous write) are sent as one
+    {"type": "batch", "items": [...]} message, so bursts of agent events cost
+    one WebSocket write instead of one each.
+    """
+    while True:
+        frame = await queue.get()
+        if frame is None:
+            return
+
+        items = [frame]
+        closing = False
+        while len(items) < WS_BATCH_MAX and not queue.empty():
+            frame = queue.get_nowait()
+            if frame is None:
+                closing = True
+                break
+            items.append(frame)
+
+        if len(items) == 1:
+            await websocket.send_text(items[0])
+        else:
+            await websocket.send_text('{"type":"batch","items":[' + ",".join(items) + "]}")
+        if closing:
+            return
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -247,16 +374,26 @@ async def websocket_endpoint(websocket: WebSocket):
     - Server sends: {"type": "session_created", "session_id": "..."}
     - Client sends: {"message": "...", "pfd_image": "base64...", "stream_data": {...}}
     - Server sends: {"type": "text|tool_use|results|error", ...}
+    - Server sends: {"type": "batch", "items": [<any of the above>, ...]}
+      when several responses are ready at once
     """
     await websocket.accept()
     session_id = str(uuid.uuid4())
     agent: Optional[ProcAgentCore] = None
+    outgoing: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+    writer = asyncio.create_task(_ws_writer(websocket, outgoing))
+
+    def send(frame: str) -> None:
+        if writer.done():
+            # Surface a failed send (e.g. client gone) in this loop
+            writer.result()
+            raise WebSocketDisconnect()
+        outgoing.put_nowait(frame)
 
     try:
         # Create session
-        settings = get_settings()
-        working_dir = Path(settings.promax.working_dir) / session_id
-        working_dir.mkdir(parents=True, exist_ok=True)
+        working_dir = _working_base() / session_id
+        await asyncio.to_thread(working_dir.mkdir, parents=True, exist_ok=True)
 
         agent = ProcAgentCore(
             session_id=session_id,
@@ -265,16 +402,20 @@ async def websocket_endpoint(websocket: WebSocket):
         sessions[session_id] = agent
 
         # Send session created message
-        await websocket.send_json({
+        send(_frame({
             "type": "session_created",
             "session_id": session_id,
-        })
+        }))
         logger.info(f"Session created: {session_id}")
 
         # Message processing loop
         while True:
-            # Receive message
-            data = await websocket.receive_json()
+            # Receive message; clients may send text or binary JSON frames
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            text = message.get("text")
+            data = _parse_frame(text if text is not None else message.get("bytes") or b"")
 
             # Parse as ChatMessage
             chat_message = ChatMessage(
@@ -285,22 +426,27 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Process message and stream responses
             async for response in agent.process_message(chat_message):
-                await websocket.send_json(response.model_dump(mode="json"))
+                # Serialized in one pass by pydantic-core, no intermediate dict
+                send(response.model_dump_json())
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {session_id}")
 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        try:
-            await websocket.send_json({
+        if not writer.done():
+            outgoing.put_nowait(_frame({
                 "type": "error",
                 "content": str(e)
-            })
-        except Exception:
-            pass
+            }))
 
     finally:
+        # Flush queued frames, then stop the writer
+        outgoing.put_nowait(None)
+        try:
+            await writer
+        except Exception:
+            pass
         # Cleanup
         if agent:
             await agent.cleanup()
@@ -319,16 +465,24 @@ async def download_file(session_id: str, filename: str):
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    settings = get_settings()
-    file_path = Path(settings.promax.working_dir) / session_id / filename
+    session_dir = _working_base() / session_id
+    file_path = (session_dir / filename).resolve()
+    # Reject names such as ".." (or "..\\x" on Windows) escaping the session
+    if not file_path.is_relative_to(session_dir):
+        raise HTTPException(status_code=404, detail="File not found")
 
-    if not file_path.exists():
+    # One stat both checks the file and is handed to Starlette, which
+    # would otherwise stat it again before streaming
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         path=file_path,
         filename=filename,
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        stat_result=stat_result,
     )
 
 
@@ -356,17 +510,20 @@ def main():
             reload=False,  # Disable reload to use our event loop
             log_level="info",
             loop="none",  # Don't let uvicorn manage the loop
+            ws_per_message_deflate=False,
         )
         server = uvicorn.Server(config)
         loop.run_until_complete(server.serve())
     else:
-        # On non-Windows, use standard uvicorn
+        # On non-Windows, uvicorn's "auto" loop picks uvloop when installed
         uvicorn.run(
             "procagent.server.app:app",
             host=settings.server.host,
             port=settings.server.port,
             reload=True,
             log_level="info",
+            loop="auto",
+            ws_per_message_deflate=False,
         )
 
 
@@ -5,9 +5,11 @@ Manages session lifecycle, VNC port allocation, and cleanup.
 """
 
 import asyncio
+import heapq
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 from ..config import get_settings
@@ -24,16 +26,16 @@ class Session:
     vnc_password: str
     working_dir: Path
     created_at: datetime = field(default_factory=datetime.now)
-    last_activity: datetime = field(default_factory=datetime.now)
+    # time.monotonic() reading; immune to wall-clock changes
+    last_activity: float = field(default_factory=time.monotonic)
 
     def update_activity(self) -> None:
         """Update last activity timestamp."""
-        self.last_activity = datetime.now()
+        self.last_activity = time.monotonic()
 
     def is_expired(self, timeout_seconds: int) -> bool:
         """Check if session has expired."""
-        elapsed = (datetime.now() - self.last_activity).total_seconds()
-        return elapsed > timeout_seconds
+        return time.monotonic() - self.last_activity > timeout_seconds
 
 
 class SessionManager:
@@ -62,6 +64,9 @@ class SessionManager:
         self.timeout_seconds = timeout_seconds
 
         self.sessions: Dict[str, Session] = {}
+        # (monotonic expiry, session_id); entries may be stale and are
+        # re-checked against last_activity when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._cleanup_task: Optional[asyncio.Task] = None
 
         settings = get_settings()
@@ -115,6 +120,10 @@ class SessionManager:
         )
 
         self.sessions[session_id] = session
+        heapq.heappush(
+            self._expiry_heap,
+            (session.last_activity + self.timeout_seconds, session_id),
+        )
         logger.info(f"Created session: {session_id}")
         return session
 
@@ -145,26 +154,44 @@ class SessionManager:
         if cleanup_files and session.working_dir.exists():
             import shutil
             try:
-                shutil.rmtree(session.working_dir)
+                await asyncio.to_thread(shutil.rmtree, session.working_dir)
             except Exception as e:
                 logger.warning(f"Failed to cleanup session files: {e}")
 
         logger.info(f"Destroyed session: {session_id}")
 
+    async def _expire_due_sessions(self) -> None:
+        """Destroy sessions whose expiry has passed, re-queueing renewed ones."""
+        now = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, session_id = heapq.heappop(self._expiry_heap)
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue  # Already destroyed
+
+            expiry = session.last_activity + self.timeout_seconds
+            if expiry > now:
+                # Active since this entry was queued
+                heapq.heappush(self._expiry_heap, (expiry, session_id))
+                continue
+
+            logger.info(f"Expiring inactive session: {session_id}")
+            await self.destroy_session(session_id, cleanup_files=True)
+
     async def _cleanup_loop(self) -> None:
         """Background task to clean up expired sessions."""
         while True:
             try:
-                await asyncio.sleep(60)  # Check every minute
-
-                expired = [
-                    sid for sid, session in self.sessions.items()
-                    if session.is_expired(self.timeout_seconds)
-                ]
-
-                for session_id in expired:
-                    logger.info(f"Expiring inactive session: {session_id}")
-                    await self.destroy_session(session_id, cleanup_files=True)
+                # The timeout is fixed, so a session created while we sleep
+                # never expires before the current heap head (or, with an
+                # empty heap, before a full timeout has passed)
+                if self._expiry_heap:
+                    delay = self._expiry_heap[0][0] - time.monotonic()
+                else:
+                    delay = self.timeout_seconds
+                await asyncio.sleep(max(0.0, delay))
+
+                await self._expire_due_sessions()
 
             except asyncio.CancelledError:
                 break
@@ -24,6 +24,7 @@ import sys
 from datetime import datetime
 
 try:
+    import pywintypes
     import win32com.client
     from win32com.client import gencache
 except ImportError:
@@ -47,13 +48,31 @@ pmxMassFlowBasis = 1
 pmxMolarFracBasis = 6
 
 
+# === Unit Conversion ===
+
+def convert_pressure_kgcm2g_to_pa(p_kgcm2g: float) -> float:
+    """Convert pressure from kg/cm²(g) to Pa (absolute)."""
+    # 1 kg/cm² = 98066.5 Pa
+    # Add atmospheric pressure (101325 Pa) to convert gauge to absolute
+    return (p_kgcm2g * 98066.5) + 101325
+
+
+def _finalize(stream: dict) -> dict:
+    """Add the SI values written to ProMax, computed once at import."""
+    stream["temperature_K"] = stream["temperature_C"] + 273.15
+    stream["pressure_Pa"] = convert_pressure_kgcm2g_to_pa(stream["pressure_kgcm2g"])
+    stream["mass_flow_kg_s"] = stream["mass_flow_kg_hr"] / 3600
+    return stream
+
+
 # === Stream Data from PDF ===
 
 # Stream 210 - SOUR OFFGAS (inlet to 301-E)
-STREAM_210 = {
+STREAM_210 = _finalize({
     "name": "210_Sour_Offgas",
     "description": "SOUR OFFGAS",
     "temperature_C": 43,
+    "pressure_kgcm2g": 4.6,
     "pressure_kPa": 4.6 * 98.0665 + 101.325,  # kg/cm²(g) to kPa(abs)
     "mass_flow_kg_hr": 4536,
     "molar_flow_kmol_hr": 196.9,
@@ -74,13 +93,14 @@ STREAM_210 = {
         "n-Hexane": 3,      # Wax approximated as n-Hexane
         "n-Heptane": 15,    # RD approximated as n-Heptane
     }
-}
+})
 
 # Stream 220 - LEAN AMINE (inlet to 301-E)
-STREAM_220 = {
+STREAM_220 = _finalize({
     "name": "220_Lean_Amine",
     "description": "LEAN AMINE",
     "temperature_C": 50,
+    "pressure_kgcm2g": 5.7,
     "pressure_kPa": 5.7 * 98.0665 + 101.325,  # kg/cm²(g) to kPa(abs)
     "mass_flow_kg_hr": 46000,
     "molar_flow_kmol_hr": 1902.1,
@@ -91,7 +111,7 @@ STREAM_220 = {
         "Hydrogen Sulfide": 39,
         "MDEA": 13800,
     }
-}
+})
 
 # Stream 211 - TREATED OFFGAS (outlet from 301-E, vapor)
 STREAM_211 = {
@@ -106,11 +126,13 @@ STREAM_222 = {
 }
 
 
-def convert_pressure_kgcm2g_to_pa(p_kgcm2g: float) -> float:
-    """Convert pressure from kg/cm²(g) to Pa (absolute)."""
-    # 1 kg/cm² = 98066.5 Pa
-    # Add atmospheric pressure (101325 Pa) to convert gauge to absolute
-    return (p_kgcm2g * 98066.5) + 101325
+def format_composition(stream: dict) -> str:
+    """Format a stream's mass composition as kg/hr and wt% lines."""
+    pct_per_kg_hr = 100.0 / stream["mass_flow_kg_hr"]
+    return "\n".join(
+        f"      {comp}: {mass} kg/hr ({mass * pct_per_kg_hr:.2f} wt%)"
+        for comp, mass in stream["composition_kg_hr"].items()
+    )
 
 
 def create_301e_amine_treater(output_dir: str) -> str:
@@ -151,11 +173,15 @@ def create_301e_amine_treater(output_dir: str) -> str:
 
     # Find stencils
     print("\n[3] Loading Visio stencils...")
+    needed = {'Streams.vss', 'Column.vss'}
     stencils = {}
-    for i in range(1, visio.Documents.Count + 1):
-        doc = visio.Documents(i)
-        if doc.Type == 2:  # Stencil
+    docs = visio.Documents
+    for i in range(1, docs.Count + 1):
+        doc = docs(i)
+        if doc.Type == 2 and doc.Name in needed:  # Stencil
             stencils[doc.Name] = doc
+            if len(stencils) == len(needed):
+                break
 
     streams_stencil = stencils.get('Streams.vss')
     column_stencil = stencils.get('Column.vss')
@@ -173,112 +199,118 @@ def create_301e_amine_treater(output_dir: str) -> str:
     # Drop shapes
     print("\n[4] Creating equipment and streams...")
 
-    # Drop inlet stream 210 (Sour Offgas) - left side, top
-    shape_210 = vpage.Drop(stream_master, 2, 9)
-    shape_210.Name = "210"
-    print(f"    Created stream: 210 (Sour Offgas)")
-
-    # Drop inlet stream 220 (Lean Amine) - left side, bottom
-    shape_220 = vpage.Drop(stream_master, 2, 5)
-    shape_220.Name = "220"
-    print(f"    Created stream: 220 (Lean Amine)")
-
-    # Drop 301-E Amine Treater column - center
-    shape_301e = vpage.Drop(column_master, 5, 7)
-    # Rename the block after it's created
-    print(f"    Created column: {shape_301e.Name} (will be renamed to 301-E)")
-
-    # Drop outlet stream 211 (Treated Offgas) - right side, top
-    shape_211 = vpage.Drop(stream_master, 8, 9)
-    shape_211.Name = "211"
-    print(f"    Created stream: 211 (Treated Offgas)")
-
-    # Drop outlet stream 222 (Rich Amine) - right side, bottom
-    shape_222 = vpage.Drop(stream_master, 8, 5)
-    shape_222.Name = "222"
-    print(f"    Created stream: 222 (Rich Amine)")
+    # (master, x, y, shape name, label) - inlets left, column center,
+    # outlets right; the column keeps its ProMax-assigned name
+    drops = (
+        (stream_master, 2, 9, "210", "stream: 210 (Sour Offgas)"),
+        (stream_master, 2, 5, "220", "stream: 220 (Lean Amine)"),
+        (column_master, 5, 7, None, "column: {} (will be renamed to 301-E)"),
+        (stream_master, 8, 9, "211", "stream: 211 (Treated Offgas)"),
+        (stream_master, 8, 5, "222", "stream: 222 (Rich Amine)"),
+    )
+    masters = tuple(d[0] for d in drops)
+    xy = tuple(v for d in drops for v in d[1:3])
+
+    # Drop all five shapes in one COM call with screen updates suspended
+    visio.ScreenUpdating = False
+    try:
+        _, shape_ids = vpage.DropMany(masters, xy)
+        shapes = vpage.Shapes
+        for (_, _, _, name, label), shape_id in zip(drops, shape_ids):
+            shape = shapes.ItemFromID(shape_id)
+            if name is None:
+                label = label.format(shape.Name)
+            else:
+                shape.Name = name
+            print(f"    Created {label}")
+    finally:
+        visio.ScreenUpdating = True
 
     # Get ProMax objects
     print("\n[5] Accessing ProMax objects...")
-    print(f"    Blocks: {fs.Blocks.Count}")
-    for i in range(fs.Blocks.Count):
-        blk = fs.Blocks(i)
-        print(f"      - {blk.Name}")
-
-    print(f"    Streams: {fs.PStreams.Count}")
-    for i in range(fs.PStreams.Count):
-        ps = fs.PStreams(i)
-        print(f"      - {ps.Name}")
+    # Bind each collection once; every fs.X access is a COM call
+    blocks = fs.Blocks
+    pstreams = fs.PStreams
+    block_names = [blocks(i).Name for i in range(blocks.Count)]
+    print(f"    Blocks: {len(block_names)}")
+    if block_names:
+        print("\n".join(f"      - {name}" for name in block_names))
+
+    stream_names = [pstreams(i).Name for i in range(pstreams.Count)]
+    print(f"    Streams: {len(stream_names)}")
+    if stream_names:
+        print("\n".join(f"      - {name}" for name in stream_names))
 
     # Get the column block (should be DTWR-100 or similar)
-    column_block = fs.Blocks(0)
+    column_block = blocks(0)
     print(f"\n    Column block: {column_block.Name}")
 
     # Set stream properties
     print("\n[6] Setting stream 210 (Sour Offgas) properties...")
-    stream_210 = fs.PStreams("210")
-    phase_210 = stream_210.Phases(pmxTotalPhase)
+    stream_210 = pstreams("210")
+    # Bind the total phase's Properties once and write all three through it
+    props_210 = stream_210.Phases(pmxTotalPhase).Properties
+    stream = STREAM_210
+    temp_K = stream["temperature_K"]
+    pres_Pa = stream["pressure_Pa"]
+    mass_flow_kgs = stream["mass_flow_kg_s"]
 
     # Temperature: 43°C = 316.15 K
-    temp_K = STREAM_210["temperature_C"] + 273.15
-    phase_210.Properties(pmxPhaseTemperature).Value = temp_K
-    print(f"    Temperature: {temp_K:.2f} K ({STREAM_210['temperature_C']}°C)")
+    props_210(pmxPhaseTemperature).Value = temp_K
+    print(f"    Temperature: {temp_K:.2f} K ({stream['temperature_C']}°C)")
 
     # Pressure: 4.6 kg/cm²(g) = ~552 kPa(abs) = 552000 Pa
-    pres_Pa = convert_pressure_kgcm2g_to_pa(4.6)
-    phase_210.Properties(pmxPhasePressure).Value = pres_Pa
-    print(f"    Pressure: {pres_Pa/1000:.1f} kPa ({4.6} kg/cm²(g))")
+    props_210(pmxPhasePressure).Value = pres_Pa
+    print(f"    Pressure: {pres_Pa/1000:.1f} kPa ({stream['pressure_kgcm2g']} kg/cm²(g))")
 
     # Mass flow: 4536 kg/hr = 1.26 kg/s
-    mass_flow_kgs = STREAM_210["mass_flow_kg_hr"] / 3600
-    phase_210.Properties(pmxPhaseMassFlow).Value = mass_flow_kgs
-    print(f"    Mass Flow: {mass_flow_kgs:.4f} kg/s ({STREAM_210['mass_flow_kg_hr']} kg/hr)")
+    props_210(pmxPhaseMassFlow).Value = mass_flow_kgs
+    print(f"    Mass Flow: {mass_flow_kgs:.4f} kg/s ({stream['mass_flow_kg_hr']} kg/hr)")
 
     print("\n[7] Setting stream 220 (Lean Amine) properties...")
-    stream_220 = fs.PStreams("220")
-    phase_220 = stream_220.Phases(pmxTotalPhase)
+    stream_220 = pstreams("220")
+    props_220 = stream_220.Phases(pmxTotalPhase).Properties
+    stream = STREAM_220
+    temp_K = stream["temperature_K"]
+    pres_Pa = stream["pressure_Pa"]
+    mass_flow_kgs = stream["mass_flow_kg_s"]
 
     # Temperature: 50°C = 323.15 K
-    temp_K = STREAM_220["temperature_C"] + 273.15
-    phase_220.Properties(pmxPhaseTemperature).Value = temp_K
-    print(f"    Temperature: {temp_K:.2f} K ({STREAM_220['temperature_C']}°C)")
+    props_220(pmxPhaseTemperature).Value = temp_K
+    print(f"    Temperature: {temp_K:.2f} K ({stream['temperature_C']}°C)")
 
     # Pressure: 5.7 kg/cm²(g)
-    pres_Pa = convert_pressure_kgcm2g_to_pa(5.7)
-    phase_220.Properties(pmxPhasePressure).Value = pres_Pa
-    print(f"    Pressure: {pres_Pa/1000:.1f} kPa ({5.7} kg/cm²(g))")
+    props_220(pmxPhasePressure).Value = pres_Pa
+    print(f"    Pressure: {pres_Pa/1000:.1f} kPa ({stream['pressure_kgcm2g']} kg/cm²(g))")
 
     # Mass flow: 46000 kg/hr
-    mass_flow_kgs = STREAM_220["mass_flow_kg_hr"] / 3600
-    phase_220.Properties(pmxPhaseMassFlow).Value = mass_flow_kgs
-    print(f"    Mass Flow: {mass_flow_kgs:.4f} kg/s ({STREAM_220['mass_flow_kg_hr']} kg/hr)")
+    props_220(pmxPhaseMassFlow).Value = mass_flow_kgs
+    print(f"    Mass Flow: {mass_flow_kgs:.4f} kg/s ({stream['mass_flow_kg_hr']} kg/hr)")
 
     # Display composition info (setting composition requires Environment setup)
     print("\n[8] Stream Compositions (reference data):")
     print("\n    Stream 210 - Sour Offgas Composition (kg/hr):")
-    for comp, mass in STREAM_210["composition_kg_hr"].items():
-        pct = mass / STREAM_210["mass_flow_kg_hr"] * 100
-        print(f"      {comp}: {mass} kg/hr ({pct:.2f} wt%)")
+    print(format_composition(STREAM_210))
 
     print("\n    Stream 220 - Lean Amine Composition (kg/hr):")
-    for comp, mass in STREAM_220["composition_kg_hr"].items():
-        pct = mass / STREAM_220["mass_flow_kg_hr"] * 100
-        print(f"      {comp}: {mass} kg/hr ({pct:.2f} wt%)")
+    print(format_composition(STREAM_220))
 
     # Check environment for available components
     print("\n[9] Checking thermodynamic environment...")
     env = fs.Environment
     print(f"    Environment: {env.Name}")
-    print(f"    Components count: {env.Components.Count}")
+    components = env.Components
+    n_comps = components.Count
+    print(f"    Components count: {n_comps}")
 
-    if env.Components.Count > 0:
+    if n_comps > 0:
         print("    Available components:")
-        for i in range(min(env.Components.Count, 20)):
-            comp = env.Components(i)
+        for i in range(min(n_comps, 20)):
+            comp = components(i)
             try:
                 name = comp.Species.SpeciesName.Name
                 print(f"      [{i}] {name}")
-            except:
+            except (pywintypes.com_error, AttributeError):
                 print(f"      [{i}] (unable to get name)")
     else:
         print("    NOTE: No components in environment yet.")
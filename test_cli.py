@@ -4,11 +4,14 @@ CLI Test for ProcAgent - bypasses web server async issues
 import asyncio
 import sys
 
-# Windows needs ProactorEventLoop for subprocess support
-if sys.platform == 'win32':
-    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-
-from claude_agent_sdk import query, ClaudeAgentOptions
+from claude_agent_sdk import (
+    query,
+    ClaudeAgentOptions,
+    AssistantMessage,
+    SystemMessage,
+    TextBlock,
+    ToolUseBlock,
+)
 
 async def test_simple():
     """Simple test without MCP servers."""
@@ -25,13 +28,13 @@ async def test_simple():
             msg_type = type(msg).__name__
             print(f"[{msg_type}]")
 
-            if hasattr(msg, 'content'):
+            if isinstance(msg, AssistantMessage):
                 for block in msg.content:
-                    if hasattr(block, 'text'):
+                    if isinstance(block, TextBlock):
                         print(f"  Text: {block.text}")
-                    elif hasattr(block, 'name'):
+                    elif isinstance(block, ToolUseBlock):
                         print(f"  Tool: {block.name}")
-            elif hasattr(msg, 'data'):
+            elif isinstance(msg, SystemMessage):
                 print(f"  Model: {msg.data.get('model', 'unknown')}")
                 print(f"  API Source: {msg.data.get('apiKeySource', 'unknown')}")
 
@@ -60,13 +63,21 @@ async def test_via_procagent():
         import traceback
         traceback.print_exc()
 
+async def run_all():
+    """Run both tests on one event loop."""
+    # Run simple test first
+    await test_simple()
+
+    # Test via ProcAgentCore
+    await test_via_procagent()
+
 if __name__ == "__main__":
+    # Windows needs ProactorEventLoop for subprocess support
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
     print("=" * 50)
     print("ProcAgent CLI Test (No MCP)")
     print("=" * 50)
 
-    # Run simple test first
-    asyncio.run(test_simple())
-
-    # Test via ProcAgentCore
-    asyncio.run(test_via_procagent())
+    asyncio.run(run_all())
@@ -36,14 +36,22 @@ class TestProcAgentSession:
         session.update_activity()
         assert session.last_activity >= old_time
 
-    def test_session_expiry(self):
+    def test_session_expiry(self, monkeypatch):
         """Test session expiry detection."""
-        session = ProcAgentSession()
+        now = datetime(2024, 1, 1)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now
+
+        monkeypatch.setattr("procagent.models.session.datetime", FrozenDatetime)
+        session = ProcAgentSession(last_activity=now)
         # Not expired by default
         assert not session.is_expired(timeout_seconds=3600)
 
         # Manually set old timestamp
-        session.last_activity = datetime.now() - timedelta(hours=2)
+        session.last_activity = now - timedelta(hours=2)
         assert session.is_expired(timeout_seconds=3600)
 
 
@@ -218,3 +226,12 @@ class TestAgentResponse:
         )
         assert resp.type == ResponseType.SESSION_CREATED
         assert resp.session_id == "abc-123"
+
+    def test_constructed_response_matches_validated(self):
+        """Test model_construct serializes like a validated response."""
+        kwargs = dict(type=ResponseType.TEXT, content="Creating amine treater block...")
+        built = AgentResponse.model_construct(**kwargs).model_dump(mode="json")
+        validated = AgentResponse(**kwargs).model_dump(mode="json")
+        assert isinstance(built.pop("timestamp"), str)
+        validated.pop("timestamp")
+        assert built == validated
@@ -1,44 +1,83 @@
 """Tests for ProMax MCP Server."""
 
+import asyncio
+import functools
+import gc
+import json
+import threading
+import types
+import weakref
+
+import jsonschema
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 
+from claude_agent_sdk import SdkMcpTool
+
+from procagent.mcp import promax_server
 from procagent.mcp.promax_server import (
     ProMaxState,
     get_promax_state,
-    create_promax_tools,
     convert_units,
     BLOCK_TYPE_MAP,
+    add_components_tool,
+    batch_build_tool,
+    connect_streams_bulk_tool,
+    convert_from_si,
+    create_block_tool,
+    create_blocks_bulk_tool,
+    create_configured_stream_tool,
+    get_stream_results_tool,
+    set_stream_composition_tool,
+    shutdown_com_thread,
+    _iter_collection,
+    _load_stencils,
+    _match_composition,
+    _parse_composition,
+    _run_com,
+    _sync_tool,
+    _visio_batch,
 )
 
 
-class TestUnitConversions:
-    """Tests for unit conversion functions."""
+@pytest.fixture
+def state():
+    """Provide the shared state, reset around every test."""
+    state = get_promax_state()
+    state.reset()
+    yield state
+    state.reset()
 
-    def test_temperature_c_to_k(self):
-        """Test Celsius to Kelvin conversion."""
-        assert convert_units(0, "C", "temperature") == 273.15
-        assert convert_units(100, "C", "temperature") == 373.15
-        assert abs(convert_units(-40, "C", "temperature") - 233.15) < 0.01
 
-    def test_temperature_f_to_k(self):
-        """Test Fahrenheit to Kelvin conversion."""
-        assert abs(convert_units(32, "F", "temperature") - 273.15) < 0.01
-        assert abs(convert_units(212, "F", "temperature") - 373.15) < 0.01
+@pytest.fixture
+def mock_flowsheet(state):
+    """Give the reset state a mock flowsheet."""
+    state.flowsheet = MagicMock()
+    return state.flowsheet
 
-    def test_pressure_kpa_to_pa(self):
-        """Test kPa to Pa conversion."""
-        assert convert_units(100, "kPa", "pressure") == 100000
-        assert convert_units(1, "kPa", "pressure") == 1000
 
-    def test_pressure_bar_to_pa(self):
-        """Test bar to Pa conversion."""
-        assert convert_units(1, "bar", "pressure") == 100000
+class TestUnitConversions:
+    """Tests for unit conversion functions."""
 
-    def test_flow_kmol_hr_to_mol_s(self):
-        """Test kmol/hr to mol/s conversion."""
-        result = convert_units(3.6, "kmol/hr", "flow")
-        assert abs(result - 1.0) < 0.001  # 3.6 kmol/hr = 1 mol/s
+    @pytest.mark.parametrize("value,unit,unit_type,expected,tol", [
+        (0, "C", "temperature", 273.15, 0),
+        (100, "C", "temperature", 373.15, 0),
+        (-40, "C", "temperature", 233.15, 0.01),
+        (32, "F", "temperature", 273.15, 0.01),
+        (212, "F", "temperature", 373.15, 0.01),
+        (100, "kPa", "pressure", 100000, 0),
+        (1, "kPa", "pressure", 1000, 0),
+        (1, "bar", "pressure", 100000, 0),
+        (3.6, "kmol/hr", "flow", 1.0, 0.001),  # 3.6 kmol/hr = 1 mol/s
+    ])
+    def test_convert_to_si(self, value, unit, unit_type, expected, tol):
+        """Test conversion of each supported unit to SI."""
+        assert abs(convert_units(value, unit, unit_type) - expected) <= tol
+
+    def test_convert_from_si_round_trip(self):
+        """Test converting back from SI inverts convert_units."""
+        assert abs(convert_from_si(convert_units(77.0, "F", "temperature"), "F", "temperature") - 77.0) < 1e-9
+        assert abs(convert_from_si(1.0, "kmol/hr", "flow") - 3.6) < 1e-9
 
     def test_invalid_unit_type(self):
         """Test invalid unit type raises error."""
@@ -51,24 +90,43 @@ class TestUnitConversions:
             convert_units(100, "InvalidUnit", "temperature")
 
 
+class TestCompositionParsing:
+    """Tests for composition string parsing."""
+
+    def test_parse_key_value(self):
+        """Test names with spaces and hyphens parse."""
+        result = _parse_composition("Carbon Dioxide=0.25, n-Butane = 0.5,Methane=2.5e-1")
+        assert result == {"Carbon Dioxide": 0.25, "n-Butane": 0.5, "Methane": 0.25}
+
+    def test_parse_malformed(self):
+        """Test malformed entries raise error."""
+        with pytest.raises(ValueError, match="Invalid composition entry"):
+            _parse_composition("Methane=0.7, Ethane")
+
+
 class TestProMaxState:
     """Tests for ProMaxState singleton."""
 
     def test_state_singleton(self):
-        """Test ProMaxState is a singleton."""
-        state1 = ProMaxState()
-        state2 = ProMaxState()
+        """Test the module shares one ProMaxState instance."""
+        state1 = get_promax_state()
+        state2 = get_promax_state()
         assert state1 is state2
+        assert isinstance(state1, ProMaxState)
+
+    def test_state_has_no_instance_dict(self):
+        """Test ProMaxState uses slots for its fields."""
+        with pytest.raises(AttributeError):
+            get_promax_state().unknown_attribute = 1
 
     def test_state_initial_values(self):
         """Test initial state values."""
         state = get_promax_state()
         state.reset()  # Ensure clean state
-        assert state.pmx is None
-        assert state.project is None
-        assert state.flowsheet is None
-        assert state.is_connected is False
-        assert state.has_flowsheet is False
+        assert (
+            state.pmx, state.project, state.flowsheet,
+            state.is_connected, state.has_flowsheet,
+        ) == (None, None, None, False, False)
 
     def test_state_reset(self):
         """Test state reset."""
@@ -76,19 +134,496 @@ class TestProMaxState:
         state.pmx = "mock"
         state.project = "mock_project"
         state.reset()
-        assert state.pmx is None
-        assert state.project is None
+        assert (state.pmx, state.project) == (None, None)
+
+
+@pytest.mark.usefixtures("mock_flowsheet")
+class TestProMaxStateCaches:
+    """Tests for cached COM proxy lookups on ProMaxState."""
+
+    def test_pstream_resolved_once(self, state):
+        """Test repeated stream access hits COM only once."""
+        first = state.get_pstream("Feed")
+        second = state.get_pstream("Feed")
+        assert first is second
+        state.flowsheet.PStreams.assert_called_once_with("Feed")
+
+    def test_phase_resolved_once(self, state):
+        """Test repeated phase access hits COM only once."""
+        state.get_phase("Feed", 5)
+        state.get_phase("Feed", 5)
+        stream = state.get_pstream("Feed")
+        stream.Phases.assert_called_once_with(5)
+
+    def test_property_resolved_once(self, state):
+        """Test repeated property access hits COM only once."""
+        first = state.get_property("Feed", 5, 0)
+        assert state.get_property("Feed", 5, 0) is first
+        phase = state.get_phase("Feed", 5)
+        phase.Properties.assert_called_once_with(0)
+
+    def test_env_component_names_cached_per_count(self, state):
+        """Test component names are re-read only when the count changes."""
+        components = MagicMock()
+        assert len(state.get_env_component_names(components, 2)) == 2
+        state.get_env_component_names(components, 2)
+        assert components.call_count == 2
+        assert len(state.get_env_component_names(components, 3)) == 3
+
+    def test_env_component_names_keyed_by_flowsheet(self, state):
+        """Test switching flowsheet forces a re-read at the same count."""
+        components = MagicMock()
+        state.get_env_component_names(components, 2)
+        state.flowsheet = MagicMock()
+        state.get_env_component_names(components, 2)
+        assert components.call_count == 4
+
+    def test_env_component_index_case_folded(self, state):
+        """Test the component index maps lower-cased names to positions."""
+        components = MagicMock()
+        names = ["Methane", "Carbon Dioxide"]
+        components.side_effect = lambda i: MagicMock(
+            **{"Species.SpeciesName.Name": names[i]}
+        )
+        index = state.get_env_component_index(components, 2)
+        assert index == {"methane": 0, "carbon dioxide": 1}
+
+    def test_invalidate_env_components(self, state):
+        """Test invalidation forces component names to be re-read."""
+        components = MagicMock()
+        state.get_env_component_names(components, 2)
+        state.invalidate_env_components()
+        state.get_env_component_names(components, 2)
+        assert components.call_count == 4
+
+    def test_extend_env_components(self, state):
+        """Test added components extend the recorded order without a re-read."""
+        components = MagicMock()
+        state.set_env_component_names(["Methane"])
+        state.extend_env_components(["Water"], 2)
+        index = state.get_env_component_index(components, 2)
+        assert index == {"methane": 0, "water": 1}
+        components.assert_not_called()
+
+    def test_extend_env_components_count_mismatch(self, state):
+        """Test an order that misses components is dropped, not extended."""
+        components = MagicMock()
+        state.set_env_component_names(["Methane"])
+        state.extend_env_components(["Water"], 3)
+        state.get_env_component_names(components, 3)
+        assert components.call_count == 3
+
+    def test_extend_env_components_unrecorded(self, state):
+        """Test extending an unrecorded order leaves it to be read once."""
+        components = MagicMock()
+        state.extend_env_components(["Water"], 2)
+        state.get_env_component_names(components, 2)
+        assert components.call_count == 2
+
+    def test_env_component_count_is_live(self, state):
+        """Test a stale recorded order neither sets the count nor the index."""
+        components = state.flowsheet.Environment.Components
+        components.Count = 3
+        state.set_env_component_names(["Methane", "Water"])
+        assert state.get_env_component_count() == 3
+        state.get_env_component_index(components, 3)
+        assert components.call_count == 3
+
+    def test_forget_stream(self, state):
+        """Test forgetting a stream drops only its cached proxies."""
+        state.get_property("Feed", 5, 0)
+        state.get_property("Gas", 5, 0)
+        state.forget_stream("Feed")
+        state.get_property("Feed", 5, 0)
+        state.get_property("Gas", 5, 0)
+        assert state.flowsheet.PStreams.call_count == 3
+
+    def test_cell_resolved_once(self, state):
+        """Test a shape cell is resolved once per shape."""
+        shape = MagicMock()
+        assert state.get_cell(shape, "EndX") is state.get_cell(shape, "EndX")
+        shape.Cells.assert_called_once_with("EndX")
+
+    def test_cell_cache_outlives_replaced_shape(self, state):
+        """Test a replaced shape stays alive so its id is not reused."""
+        shape = MagicMock()
+        state.get_cell(shape, "EndX")
+        ref = weakref.ref(shape)
+        state.stream_shapes["Feed"] = shape = MagicMock()
+        gc.collect()
+        assert ref() is not None
+        assert state.get_cell(shape, "EndX") is shape.Cells.return_value
+
+    def test_master_resolved_once(self, state):
+        """Test a stencil master is resolved once."""
+        stencil = MagicMock()
+        state.stencils["Streams.vss"] = stencil
+        state.get_master("Streams.vss", "Process Stream")
+        state.get_master("Streams.vss", "Process Stream")
+        stencil.Masters.assert_called_once_with("Process Stream")
+
+    def test_comp_buffer_reused_and_zeroed(self, state):
+        """Test the composition buffer is reused and cleared per call."""
+        buffer = state.get_comp_buffer(3)
+        buffer[1] = 0.5
+        again = state.get_comp_buffer(3)
+        assert again is buffer
+        assert list(again) == [0.0, 0.0, 0.0]
+        assert len(state.get_comp_buffer(4)) == 4
+
+    def test_flowsheet_collections_resolved_once(self, state):
+        """Test PStreams/Components/Solver are fetched once per flowsheet."""
+        assert state.pstreams is state.pstreams
+        assert state.env_components is state.flowsheet.Environment.Components
+        assert state.solver is state.flowsheet.Solver
+        state.clear_caches()
+        state.flowsheet = MagicMock()
+        assert state.pstreams is state.flowsheet.PStreams
+
+    def test_load_stencils_resolves_masters(self, state):
+        """Test loading stencils resolves the known masters up front."""
+        streams = MagicMock(Type=2)
+        streams.Name = "Streams.vss"
+        drawing = MagicMock(Type=1)
+        state.visio = MagicMock()
+        state.visio.Documents.__iter__.return_value = [streams, drawing]
+        _load_stencils(state)
+        assert list(state.stencils) == ["Streams.vss"]
+        streams.Masters.assert_called_once_with("Process Stream")
+        state.get_master("Streams.vss", "Process Stream")
+        streams.Masters.assert_called_once()
+
+    def test_reset_clears_caches(self, state):
+        """Test reset drops cached proxies."""
+        state.get_phase("Feed", 5)
+        state.reset()
+        state.flowsheet = MagicMock()
+        state.get_pstream("Feed")
+        state.flowsheet.PStreams.assert_called_once_with("Feed")
+
+
+class TestCompositionMatching:
+    """Tests for matching user compositions to environment order."""
+
+    def test_match_composition(self):
+        """Test names match case-insensitively and unknowns are reported."""
+        values = [0.0, 0.0, 0.0]
+        matched, unmatched = _match_composition(
+            {"methane": 0, "water": 2},
+            [("WATER", 0.25), ("Methane", 0.75), ("Argon", 0.0)],
+            values,
+        )
+        assert values == [0.75, 0.0, 0.25]
+        assert matched == ["WATER", "Methane"]
+        assert unmatched == ["Argon"]
+
+
+class TestIterCollection:
+    """Tests for COM collection iteration."""
+
+    def test_uses_enumerator(self):
+        """Test collections with an enumerator are iterated directly."""
+        assert list(_iter_collection(["a", "b"])) == ["a", "b"]
+
+    def test_falls_back_to_index(self):
+        """Test collections without an enumerator are indexed from 0."""
+        collection = MagicMock(spec=["Count", "__call__"])
+        collection.Count = 2
+        collection.side_effect = lambda i: f"item{i}"
+        assert list(_iter_collection(collection)) == ["item0", "item1"]
+
+
+class TestComThread:
+    """Tests for the COM worker thread."""
+
+    @pytest.mark.asyncio
+    async def test_sync_tools_run_on_com_thread(self):
+        """Test tool bodies run off the event loop on one worker thread."""
+
+        @_sync_tool("thread_probe", "Report the current thread", {})
+        def probe(args):
+            return {"thread": threading.current_thread()}
+
+        first = await probe.handler({})
+        second = await probe.handler({})
+        assert first["thread"] is not threading.current_thread()
+        assert first["thread"] is second["thread"]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_and_restarts_thread(self):
+        """Test the COM thread stops on shutdown and restarts on next use."""
+        first = await _run_com(lambda args: threading.current_thread(), {})
+        shutdown_com_thread()
+        assert not first.is_alive()
+        second = await _run_com(lambda args: threading.current_thread(), {})
+        assert second is not first and second.is_alive()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_timeout_keeps_one_thread(self):
+        """Test a worker outliving the shutdown timeout is never joined by a second one."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def block(args):
+            started.set()
+            release.wait(5)
+            return threading.current_thread()
+
+        pending = asyncio.ensure_future(_run_com(block, {}))
+        await asyncio.to_thread(started.wait, 5)
+        shutdown_com_thread(timeout=0.01)
+        with pytest.raises(RuntimeError, match="still shutting down"):
+            await _run_com(lambda args: None, {})
+
+        release.set()
+        first = await pending
+        await asyncio.to_thread(first.join, 5)
+        second = await _run_com(lambda args: threading.current_thread(), {})
+        assert second is not first and second.is_alive()
+
+
+@pytest.mark.usefixtures("mock_flowsheet")
+class TestCompositeTools:
+    """Tests for the batched ProMax tools (background mode, mocked COM)."""
+
+    @pytest.mark.asyncio
+    async def test_configured_stream_runs_all_steps(self, state):
+        """Test create, properties and flash happen in one call."""
+        result = await create_configured_stream_tool.handler({
+            "name": "Feed", "temperature_c": 25.0, "pressure_kpa": 101.325,
+        })
+        text = result["content"][0]["text"]
+        state.flowsheet.CreatePStream.assert_called_once_with("Feed")
+        assert "Set Feed properties" in text
+        assert "Flash calculation completed for 'Feed'" in text
+
+    def test_configured_stream_schema_optional_steps(self):
+        """Test the input schema only requires the name and position."""
+        schema = create_configured_stream_tool.input_schema
+        jsonschema.validate({"name": "Feed", "x": 50, "y": 105.0}, schema)
+        jsonschema.validate({
+            "name": "Feed", "x": 50, "y": 105.0, "block_name": "V-100",
+            "connection_point": 1, "composition": {"Methane": 1.0}, "flash": False,
+        }, schema)
+        with pytest.raises(jsonschema.ValidationError):
+            jsonschema.validate({"name": "Feed"}, schema)
+
+    @pytest.mark.asyncio
+    async def test_created_stream_is_cached(self, state):
+        """Test the PStream returned on creation is reused without a lookup."""
+        await create_configured_stream_tool.handler({"name": "Feed", "temperature_c": 25.0})
+        state.flowsheet.PStreams.assert_not_called()
+        state.flowsheet.CreatePStream.return_value.Flash.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_configured_stream_stops_on_error(self, state):
+        """Test a failing step stops the sequence before flashing."""
+        result = await create_configured_stream_tool.handler({
+            "name": "Feed", "composition": {"Methane": 0.5},
+        })
+        text = result["content"][0]["text"]
+        assert "Error: Composition must sum to 1.0" in text
+        assert "Flash" not in text
+
+    @pytest.mark.asyncio
+    async def test_configured_stream_connects_to_block(self, state):
+        """Test a configured stream is glued to its block before flashing."""
+        state.with_gui = True
+        state.vpage = MagicMock()
+        state.stencils["Streams.vss"] = MagicMock()
+        block = MagicMock()
+        state.block_shapes["V-100"] = block
+        result = await create_configured_stream_tool.handler({
+            "name": "Feed", "block_name": "V-100", "connection_point": 1,
+        })
+        text = result["content"][0]["text"]
+        assert "Connected 'Feed' to 'V-100' (point 1, inlet)" in text
+        shape = state.vpage.Drop.return_value
+        shape.Cells.return_value.GlueTo.assert_called_once_with(block.Cells.return_value)
+        assert "Flash calculation completed for 'Feed'" in text
 
+    @pytest.mark.asyncio
+    async def test_composition_normalized_within_tolerance(self, state):
+        """Test a near-1.0 composition is rescaled before it is written."""
+        state.set_env_component_names(["Methane", "Ethane"])
+        state.flowsheet.Environment.Components.Count = 2
+        result = await set_stream_composition_tool.handler({
+            "stream_name": "Feed", "composition": {"Methane": 0.7005, "Ethane": 0.3},
+        })
+        assert "Set Feed composition (2 components)" in result["content"][0]["text"]
+        comp_obj = state.get_phase("Feed", 5).Composition.return_value
+        assert isinstance(comp_obj.SIValues, tuple)
+        assert sum(comp_obj.SIValues) == pytest.approx(1.0, abs=1e-12)
+
+    @pytest.mark.asyncio
+    async def test_blocks_bulk_reports_each_block(self, state):
+        """Test bulk block creation continues past bad entries."""
+        result = await create_blocks_bulk_tool.handler({"blocks": [
+            {"block_type": "separator", "name": "V-100"},
+            {"block_type": "boiler", "name": "B-100"},
+        ]})
+        text = result["content"][0]["text"]
+        assert text.startswith("Created 1/2 blocks")
+        assert "Unknown block type 'boiler'" in text
+
+    @pytest.mark.asyncio
+    async def test_stream_results_reuse_property_objects(self, state):
+        """Test repeated result reads resolve each property object once."""
+        await get_stream_results_tool.handler({"stream_name": "Feed"})
+        await get_stream_results_tool.handler({"stream_name": "Feed"})
+        phase = state.flowsheet.PStreams("Feed").Phases(5)
+        assert phase.Properties.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_create_block_accepts_block_type_values(self, state):
+        """Test BlockType values such as 'AmineTreater' map to block types."""
+        result = await create_block_tool.handler({"block_type": "AmineTreater", "name": "T-100"})
+        assert "Created staged_column block 'T-100'" in result["content"][0]["text"]
+        state.flowsheet.Blocks.Add.assert_called_once_with(15, "T-100")
+
+    @pytest.mark.asyncio
+    async def test_add_components_skips_repeats(self, state):
+        """Test repeated and blank component names are not sent to ProMax."""
+        result = await add_components_tool.handler({"components": "Methane, methane, ,Water"})
+        env_components = state.flowsheet.Environment.Components
+        assert env_components.Add.call_count == 2
+        assert "Added 2 components: Methane, Water" in result["content"][0]["text"]
 
+    @pytest.mark.asyncio
+    async def test_batch_build_runs_in_given_order(self, state):
+        """Test ops run as given and failures skip the ops that reference them."""
+        result = await batch_build_tool.handler({"ops": [
+            {"id": "feed", "tool": "create_stream", "args": {"name": "Feed"}},
+            {"id": "props", "tool": "set_stream_properties",
+             "args": {"stream_name": {"$ref": "feed"}, "temperature_c": 25.0}},
+            {"id": "glue", "tool": "connect_stream",
+             "args": {"stream_name": {"$ref": "feed"}, "block_name": "V-100"}},
+            {"id": "flash", "tool": "flash_stream", "args": {"stream_name": {"$ref": "glue"}}},
+        ]})
+        lines = result["content"][0]["text"].splitlines()
+        assert lines[0] == "Completed 2/4 operations"
+        assert lines[1].startswith("[feed] Created stream 'Feed'")
+        assert lines[2].startswith("[props] Set Feed properties")
+        assert "require GUI mode" in lines[3]
+        assert lines[4] == "[flash] Skipped: depends on a failed op"
+
+    @pytest.mark.asyncio
+    async def test_batch_build_rejects_forward_refs(self, state):
+        """Test a reference to a later op is reported without running anything."""
+        result = await batch_build_tool.handler({"ops": [
+            {"id": "flash", "tool": "flash_stream", "args": {"stream_name": {"$ref": "feed"}}},
+            {"id": "feed", "tool": "create_stream", "args": {"name": "Feed"}},
+        ]})
+        assert "references unknown or later op(s): feed" in result["content"][0]["text"]
+        state.flowsheet.CreatePStream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_build_rejects_duplicate_ids(self, state):
+        """Test a repeated id, explicit or by index, is reported up front."""
+        result = await batch_build_tool.handler({"ops": [
+            {"tool": "create_stream", "args": {"name": "Feed"}},
+            {"id": "0", "tool": "create_stream", "args": {"name": "Gas"}},
+        ]})
+        assert result["content"][0]["text"] == "Error: Duplicate batch op id '0'"
+        state.flowsheet.CreatePStream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_results_for_several_streams(self, state):
+        """Test comma-separated names return one result per stream."""
+        for prop in (0, 1, 16):
+            state.get_property("Feed", 5, prop).Value = 300.0
+            state.get_property("Gas", 5, prop).Value = 300.0
+        result = await get_stream_results_tool.handler({"stream_name": "Feed, Gas"})
+        data = json.loads(result["content"][0]["text"])
+        assert [item["stream_name"] for item in data] == ["Feed", "Gas"]
+
+    def test_visio_batch_restores_on_error(self, state):
+        """Test the Visio batch closes its undo scope and re-enables updates."""
+        state.with_gui = True
+        state.visio = MagicMock()
+        with pytest.raises(RuntimeError):
+            with _visio_batch(state, "bulk"):
+                raise RuntimeError("drop failed")
+        state.visio.BeginUndoScope.assert_called_once_with("bulk")
+        state.visio.EndUndoScope.assert_called_once()
+        assert state.visio.ScreenUpdating is True
+
+    @pytest.mark.asyncio
+    async def test_blocks_bulk_uses_drop_many(self, state):
+        """Test GUI-mode bulk creation drops all valid shapes in one call."""
+        state.with_gui = True
+        state.visio = MagicMock()
+        state.vpage = MagicMock()
+        state.stencils["Separators.vss"] = MagicMock()
+        state.stencils["Valves.vss"] = MagicMock()
+        state.vpage.DropMany.return_value = (2, (11, 12))
+        result = await create_blocks_bulk_tool.handler({"blocks": [
+            {"block_type": "separator", "name": "V-100", "x": 25.4, "y": 50.8},
+            {"block_type": "boiler", "name": "B-100"},
+            {"block_type": "valve", "name": "JT-100"},
+        ]})
+        lines = result["content"][0]["text"].splitlines()
+        state.vpage.Drop.assert_not_called()
+        masters, xy = state.vpage.DropMany.call_args[0]
+        assert len(masters) == 2 and xy[:2] == pytest.approx((1.0, 2.0))
+        assert lines[0] == "Created 2/3 blocks"
+        assert "Unknown block type 'boiler'" in lines[2]
+        assert state.block_shapes["JT-100"] is state.vpage.Shapes.ItemFromID(12)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tool_name,args,needle", [
+        ("create_blocks_bulk", {"blocks": "[{"}, "Error: Failed to parse blocks"),
+        ("create_blocks_bulk", {"blocks": ["V-100"]}, "Error: blocks must be a list of objects"),
+        ("connect_streams_bulk", {"connections": "{}"}, "Error: connections must be a list of objects"),
+        ("batch_build", {"ops": [{"tool": "flash_stream", "args": []}]}, "Error: Op '0' args must be an object"),
+    ])
+    async def test_bulk_tools_reject_bad_specs(self, state, promax_tools, tool_name, args, needle):
+        """Test malformed bulk arguments come back as error text."""
+        state.with_gui = True
+        state.visio = MagicMock()
+        assert (await promax_tools[tool_name](**args)).startswith(needle)
+
+    @pytest.mark.asyncio
+    async def test_connect_streams_bulk(self, state):
+        """Test bulk connections glue each stream and report missing shapes."""
+        state.with_gui = True
+        state.visio = MagicMock()
+        state.stream_shapes["Feed"] = MagicMock()
+        state.block_shapes["V-100"] = MagicMock()
+        result = await connect_streams_bulk_tool.handler({"connections": [
+            {"stream_name": "Feed", "block_name": "V-100", "connection_point": 1, "is_inlet": True},
+            {"stream_name": "Gas", "block_name": "V-100", "connection_point": 2, "is_inlet": False},
+        ]})
+        text = result["content"][0]["text"]
+        assert text.startswith("Connected 1/2 streams")
+        assert "Stream 'Gas' not found" in text
+        state.stream_shapes["Feed"].Cells("EndX").GlueTo.assert_called_once()
+
+
+async def _tool_text(tool, **args) -> str:
+    """Call an MCP tool's handler and return its text content."""
+    result = await tool.handler(args)
+    return result["content"][0]["text"]
+
+
+@pytest.fixture(scope="session")
+def promax_tools():
+    """Map each ProMax MCP tool name to an async text-returning call, built once."""
+    return {
+        obj.name: functools.partial(_tool_text, obj)
+        for obj in vars(promax_server).values()
+        if isinstance(obj, SdkMcpTool)
+    }
+
+
+@pytest.mark.usefixtures("state")
 class TestProMaxTools:
     """Tests for ProMax MCP tools."""
 
     @pytest.fixture
-    def tools(self):
-        """Create tools and reset state."""
-        state = get_promax_state()
-        state.reset()
-        return create_promax_tools()
+    def tools(self, promax_tools):
+        """Provide the session's tool calls."""
+        return promax_tools
 
     @pytest.fixture
     def mock_promax(self):
@@ -98,6 +633,16 @@ class TestProMaxTools:
         mock_pmx.Version.Minor = 0
         return mock_pmx
 
+    GUARD_CASES = [
+        ("create_project", {"flowsheet_name": "TestFlowsheet"}, "Not connected"),
+        ("add_components", {"components": ["Methane", "Water"]}, "No flowsheet"),
+        ("create_block", {"block_type": "AmineTreater", "name": "Test-Block"}, "No flowsheet"),
+        ("flash_stream", {"stream_name": "TestStream"}, "No flowsheet"),
+        ("run_simulation", {}, "No flowsheet"),
+        ("save_project", {"filepath": "test.prx"}, "No project"),
+        ("close_project", {}, "No project"),
+    ]
+
     @pytest.mark.asyncio
     async def test_connect_promax_not_windows(self, tools):
         """Test connect fails gracefully on non-Windows."""
@@ -108,74 +653,41 @@ class TestProMaxTools:
                 assert "Failed" in result or "Error" in result or "Connected" in result
 
     @pytest.mark.asyncio
-    async def test_create_project_not_connected(self, tools):
-        """Test create_project fails when not connected."""
-        result = await tools["create_project"]("TestFlowsheet")
-        assert "Error" in result
-        assert "Not connected" in result
-
-    @pytest.mark.asyncio
-    async def test_add_components_no_flowsheet(self, tools):
-        """Test add_components fails when no flowsheet."""
-        result = await tools["add_components"](["Methane", "Water"])
-        assert "Error" in result
-        assert "No flowsheet" in result
-
-    @pytest.mark.asyncio
-    async def test_create_block_no_flowsheet(self, tools):
-        """Test create_block fails when no flowsheet."""
-        result = await tools["create_block"]("AmineTreater", "Test-Block")
-        assert "Error" in result
-        assert "No flowsheet" in result
+    async def test_connect_promax_background(self, tools, state, mock_promax):
+        """Test connect reports the ProMax version in background mode."""
+        with patch("procagent.mcp.promax_server._dispatch", return_value=mock_promax) as dispatch:
+            result = await tools["connect_promax"](with_gui=False)
+        dispatch.assert_called_once_with("ProMax.ProMax")
+        assert result == "Connected to ProMax 6.0 (background mode)"
+        assert state.pmx is mock_promax and not state.with_gui
+
+    # The guards return before any COM work; share one loop across the cases
+    @pytest.mark.asyncio(loop_scope="class")
+    @pytest.mark.parametrize("tool_name,args,needle", GUARD_CASES)
+    async def test_guard_without_session(self, tools, tool_name, args, needle):
+        """Test tools report a missing connection, flowsheet or project."""
+        result = await tools[tool_name](**args)
+        assert needle in result
 
     @pytest.mark.asyncio
-    async def test_create_block_invalid_type(self, tools):
+    async def test_create_block_invalid_type(self, tools, state):
         """Test create_block fails with invalid block type."""
-        state = get_promax_state()
-        state.flowsheet = MagicMock()  # Fake flowsheet
-        result = await tools["create_block"]("InvalidType", "Test-Block")
+        state.flowsheet = types.SimpleNamespace()  # Fake flowsheet
+        result = await tools["create_block"](block_type="InvalidType", name="Test-Block")
         assert "Error" in result
         assert "Unknown block type" in result
 
     @pytest.mark.asyncio
-    async def test_set_stream_composition_invalid_sum(self, tools):
+    async def test_set_stream_composition_invalid_sum(self, tools, state):
         """Test composition validation rejects invalid sum."""
-        state = get_promax_state()
-        state.flowsheet = MagicMock()
+        state.flowsheet = types.SimpleNamespace()
         result = await tools["set_stream_composition"](
-            "TestStream",
-            {"Methane": 0.5, "Ethane": 0.3}  # Sum = 0.8, not 1.0
+            stream_name="TestStream",
+            composition={"Methane": 0.5, "Ethane": 0.3}  # Sum = 0.8, not 1.0
         )
         assert "Error" in result
         assert "sum to 1.0" in result
 
-    @pytest.mark.asyncio
-    async def test_flash_stream_no_flowsheet(self, tools):
-        """Test flash_stream fails when no flowsheet."""
-        result = await tools["flash_stream"]("TestStream")
-        assert "Error" in result
-        assert "No flowsheet" in result
-
-    @pytest.mark.asyncio
-    async def test_run_simulation_no_flowsheet(self, tools):
-        """Test run_simulation fails when no flowsheet."""
-        result = await tools["run_simulation"]()
-        assert "Error" in result
-        assert "No flowsheet" in result
-
-    @pytest.mark.asyncio
-    async def test_save_project_no_project(self, tools):
-        """Test save_project fails when no project."""
-        result = await tools["save_project"]("test.prx")
-        assert "Error" in result
-        assert "No project" in result
-
-    @pytest.mark.asyncio
-    async def test_close_project_no_project(self, tools):
-        """Test close_project when no project."""
-        result = await tools["close_project"]()
-        assert "No project" in result
-
 
 class TestBlockTypeMap:
     """Tests for block type mapping."""
@@ -186,11 +698,15 @@ class TestBlockTypeMap:
             "AmineTreater", "Separator", "HeatExchanger",
             "Compressor", "Pump", "Valve", "Mixer", "Splitter"
         ]
-        for block_type in expected_types:
-            assert block_type in BLOCK_TYPE_MAP
+        missing = set(expected_types) - BLOCK_TYPE_MAP.keys()
+        assert not missing, missing
 
     def test_mapping_has_required_keys(self):
         """Test each mapping has stencil and master keys."""
-        for block_type, mapping in BLOCK_TYPE_MAP.items():
-            assert "stencil" in mapping, f"{block_type} missing stencil"
-            assert "master" in mapping, f"{block_type} missing master"
+        required = {"stencil", "master"}
+        missing = {
+            block_type: required - mapping.keys()
+            for block_type, mapping in BLOCK_TYPE_MAP.items()
+            if not required <= mapping.keys()
+        }
+        assert not missing, missing
@@ -0,0 +1,77 @@
+"""Tests for session expiry in the SessionManager."""
+
+import time
+
+import pytest
+from unittest.mock import AsyncMock
+
+from procagent.server.session import SessionManager
+
+
+TIMEOUT = 60
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        # Start at the real reading: Session's default factory still uses it
+        self.now = time.monotonic()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze time.monotonic behind a manually advanced clock."""
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Provide a session manager with its working directories under tmp_path."""
+    manager = SessionManager(timeout_seconds=TIMEOUT)
+    manager.working_base = tmp_path
+    return manager
+
+
+class TestSessionExpiry:
+    """Tests for heap-driven session expiry."""
+
+    @pytest.mark.asyncio
+    async def test_expired_session_destroyed(self, manager, clock):
+        """Test a session idle past the timeout is destroyed with its files."""
+        session = manager.create_session("s1")
+        clock.advance(TIMEOUT + 1)
+        await manager._expire_due_sessions()
+        assert "s1" not in manager.sessions
+        assert not session.working_dir.exists()
+        assert manager._expiry_heap == []
+
+    @pytest.mark.asyncio
+    async def test_touched_session_requeued(self, manager, clock):
+        """Test a session active since it was queued is re-pushed, not destroyed."""
+        manager.create_session("s1")
+        clock.advance(TIMEOUT / 2)
+        manager.get_session("s1")
+        clock.advance(TIMEOUT / 2 + 1)
+        await manager._expire_due_sessions()
+        assert "s1" in manager.sessions
+        assert manager._expiry_heap == [(clock.now - 1 + TIMEOUT / 2, "s1")]
+
+    @pytest.mark.asyncio
+    async def test_destroyed_session_entry_skipped(self, manager, clock):
+        """Test a popped entry for an already destroyed session is dropped."""
+        manager.create_session("s1")
+        await manager.destroy_session("s1")
+        manager.destroy_session = AsyncMock()
+        clock.advance(TIMEOUT + 1)
+        await manager._expire_due_sessions()
+        manager.destroy_session.assert_not_awaited()
+        assert manager._expiry_heap == []
@@ -0,0 +1,66 @@
+"""Tests for the WebSocket writer that coalesces outgoing frames."""
+
+import asyncio
+import json
+
+import pytest
+
+from procagent.server.app import WS_BATCH_MAX, _frame, _ws_writer
+
+
+class FakeWebSocket:
+    """Record the text frames a writer sends."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+
+async def _drain(*frames):
+    """Queue frames (None included), run the writer to completion, return what it sent."""
+    websocket = FakeWebSocket()
+    queue = asyncio.Queue()
+    for frame in frames:
+        queue.put_nowait(frame)
+    await asyncio.wait_for(_ws_writer(websocket, queue), 1)
+    return websocket.sent, queue
+
+
+class TestWsWriter:
+    """Tests for _ws_writer batching."""
+
+    @pytest.mark.asyncio
+    async def test_single_frame_passthrough(self):
+        """Test a frame with nothing queued behind it is sent unwrapped and at once."""
+        websocket = FakeWebSocket()
+        queue = asyncio.Queue()
+        writer = asyncio.create_task(_ws_writer(websocket, queue))
+        frame = _frame({"type": "session_created", "session_id": "s1"})
+        queue.put_nowait(frame)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert websocket.sent == [frame]
+        queue.put_nowait(None)
+        await asyncio.wait_for(writer, 1)
+        assert websocket.sent == [frame]
+
+    @pytest.mark.asyncio
+    async def test_queued_frames_batched_and_flushed_on_sentinel(self):
+        """Test queued frames go out as one batch before the writer stops."""
+        frames = [_frame({"type": "text", "content": str(i)}) for i in range(3)]
+        sent, queue = await _drain(*frames, None, _frame({"type": "late"}))
+        assert sent == ['{"type":"batch","items":[' + ",".join(frames) + "]}"]
+        assert json.loads(sent[0])["items"][2] == {"type": "text", "content": "2"}
+        assert queue.qsize() == 1  # Nothing after the sentinel is sent
+
+    @pytest.mark.asyncio
+    async def test_batch_capped_at_max(self):
+        """Test a burst larger than WS_BATCH_MAX is split across messages."""
+        frames = [_frame({"type": "text", "content": str(i)}) for i in range(WS_BATCH_MAX + 1)]
+        sent, _ = await _drain(*frames, None)
+        assert sent == [
+            '{"type":"batch","items":[' + ",".join(frames[:WS_BATCH_MAX]) + "]}",
+            frames[WS_BATCH_MAX],
+        ]